@@ -0,0 +1,44 @@
+#-----------------------------------------------------------------
+# pycparser: parse_and_render.py
+#
+# Parses a C file and renders its parse tree graph as a PNG image,
+# using pydot.
+#
+# License: BSD
+#-----------------------------------------------------------------
+from __future__ import print_function
+import io
+import os
+import sys
+import time
+
+import pydot
+
+# This is not required if you've installed pycparser into
+# your site-packages/ with setup.py
+#
+sys.path.extend(['.', '..'])
+
+from pycparser.c_parser import CParser
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: parse_and_render.py <file.c> [<out.png>]")
+        sys.exit(1)
+    filename = sys.argv[1]
+    if len(sys.argv) > 2:
+        pngname = sys.argv[2]
+    else:
+        pngname = os.path.splitext(filename)[0] + '.png'
+
+    graph = pydot.Dot(graph_type='digraph')
+    t1 = time.time()
+    parser = CParser(lex_optimize=False, yacc_optimize=False, graph=graph)
+    sys.stdout.write(str(time.time() - t1) + '\n')
+    with io.open(filename) as f:
+        text = f.read()
+
+    # set debuglevel to 2 for debugging
+    ast, graph = parser.parse(text, filename, debuglevel=0)
+    graph.write_png(pngname)
@@ -15,7 +15,7 @@ import sys
 #
 sys.path.extend(['.', '..', '../..', "../../.."])
 import pydot
-from pycparser import parse_file
+from pycparser import parse_file, CParser
 
 
 if __name__ == "__main__":
@@ -32,10 +32,13 @@ if __name__ == "__main__":
 			filename  = sys.argv[4]
 
 		# filename = 'examples/c_files/text2.c'
+	# Cache the parsing tables in the working directory, so only the first
+	# run pays for generating them
+	parser = CParser(yacc_picklefile='yacctab.pickle', graph=graph)
 	ast, graph_returned = parse_file(filename, use_cpp=True,
             cpp_path='cpp',
             cpp_args=r'-Iutils/fake_libc_include',
-            graph=graph)
+            parser=parser)
 	if graph_returned is not None:
 		graph_returned.write_png(graphname)
 	# ast.show(showcoord=True)
@@ -10,8 +10,9 @@
 __all__ = ['c_lexer', 'c_parser', 'c_ast']
 __version__ = '2.17'
 
+import io
 from subprocess import Popen, PIPE
-from c_parser import CParser
+from .c_parser import CParser
 
 
 def preprocess_file(filename, cpp_path='cpp', cpp_args=''):
@@ -52,7 +53,7 @@ def preprocess_file(filename, cpp_path='cpp', cpp_args=''):
 
 
 def parse_file(filename, use_cpp=False, cpp_path='cpp', cpp_args='',
-               parser=None, graph=None):
+               parser=None, graph=None, build_graph=False):
     """ Parse a C file using pycparser.
 
         filename:
@@ -77,17 +78,26 @@ def parse_file(filename, use_cpp=False, cpp_path='cpp', cpp_args='',
         parser:
             Optional parser object to be used instead of the default CParser
 
-        When successful, an AST is returned. ParseError can be
-        thrown if the file doesn't parse successfully.
+        graph:
+            Optional pydot graph for the default CParser to add the parse
+            tree to.
+
+        build_graph:
+            Set to True for the default CParser to build the parse tree
+            even without a pydot graph, and return it as DOT text.
+
+        When successful, an AST is returned along with the parse tree
+        graph, as by CParser.parse. ParseError can be thrown if the
+        file doesn't parse successfully.
 
         Errors from cpp will be printed out.
     """
     if use_cpp:
         text = preprocess_file(filename, cpp_path, cpp_args)
     else:
-        with open(filename, 'rU') as f:
+        with io.open(filename) as f:
             text = f.read()
 
     if parser is None:
-        parser = CParser(graph=graph)
+        parser = CParser(graph=graph, build_graph=build_graph)
     return parser.parse(text, filename)
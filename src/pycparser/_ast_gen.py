@@ -10,6 +10,8 @@
 # Eli Bendersky [http://eli.thegreenplace.net]
 # License: BSD
 #-----------------------------------------------------------------
+from __future__ import print_function
+
 import pprint
 from string import Template
 
@@ -51,7 +53,7 @@ class ASTCodeGenerator(object):
                     raise RuntimeError("Invalid line in %s:\n%s\n" % (filename, line))
 
                 name = line[:colon_i]
-                print "name ", name
+                print("name ", name)
                 val = line[lbracket_i + 1:rbracket_i]
                 vallist = [v.strip() for v in val.split(',')] if val else []
                 yield name, vallist
@@ -0,0 +1,54 @@
+#------------------------------------------------------------------------------
+# pycparser: ast_to_dot.py
+#
+# DotEmitter class: renders a c_ast tree as a graph in the DOT language.
+#
+# License: BSD
+#------------------------------------------------------------------------------
+from . import c_ast
+
+
+class DotEmitter(c_ast.NodeVisitor):
+    """ Walks an AST once, after parsing, and renders it as a DOT
+        digraph: one node per AST node, labeled with its class name,
+        and one edge from each node to each of its children.
+
+        Unlike the parse-tree graph CParser builds while reducing,
+        this graph has the shape of the final AST and costs nothing
+        during the parse itself. To use it:
+
+        emitter = DotEmitter()
+        emitter.visit(ast)
+        text = emitter.to_string()
+    """
+    def __init__(self):
+        self.lines = ['digraph G {']
+        self._n = 0
+
+    def generic_visit(self, node):
+        """ Emits the node and the edges to its children, and returns
+            the number the node was given.
+        """
+        my = self._n
+        self._n += 1
+        self.lines.append(
+            'node_%d [label="%s"];' % (my, node.__class__.__name__))
+        for c_name, c in node.children():
+            # Lists built by the parser also carry graph refs, which
+            # are not AST nodes
+            if isinstance(c, c_ast.Node):
+                self.lines.append('node_%d -> node_%d;' % (my, self.visit(c)))
+        return my
+
+    def to_string(self):
+        """ Returns the DOT text of everything visited so far.
+        """
+        return '\n'.join(self.lines + ['}']) + '\n'
+
+
+def ast_to_dot(ast):
+    """ Returns the DOT text of the graph of the given AST.
+    """
+    emitter = DotEmitter()
+    emitter.visit(ast)
+    return emitter.to_string()
@@ -7,7 +7,7 @@
 # License: BSD
 #------------------------------------------------------------------------------
 
-import c_ast
+from . import c_ast
 
 
 def fix_switch_cases(switch_node):
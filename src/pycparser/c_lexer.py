@@ -9,8 +9,8 @@
 import re
 import sys
 
-from ply import lex
-from ply.lex import TOKEN
+from .ply import lex
+from .ply.lex import TOKEN
 
 
 class CLexer(object):
@@ -7,18 +7,131 @@
 # License: BSD
 #------------------------------------------------------------------------------
 import re
-import pydot
+import itertools
+from array import array
+from collections import namedtuple
+
+from .ply import yacc
+
+from . import c_ast
+from .c_lexer import CLexer
+from .plyparser import PLYParser, Coord, ParseError
+from .ast_transforms import fix_switch_cases
+
+
+class _Value(int):
+    """ Marks an rhs index given to _make_rule whose grammar value may
+        not be an AST node: a list, a declaration specifier dict, or
+        None for an empty *_opt. Its ref is looked up with
+        CParser._ref instead of read from the ref attribute.
+    """
+    pass
+
+
+# Value of a nonterminal that stands for a single token: the token's
+# string, and the id of the graph node built for it
+_Token = namedtuple('_Token', ['value', 'ref'])
+
+
+# Kinds of child in a _make_rule edge topology
+_LEAF, _NODE, _VALUE = range(3)
+
+
+def _rule_shape(nt_label, rhs):
+    """ Works out the graph shape of a production given as a _make_rule
+        rhs: the labels of its new nodes, the leaves in order and then
+        the nt_label node, and its edge topology, a constant tuple of
+        (kind, index) pairs.
+    """
+    labels = tuple(sym for sym in rhs if isinstance(sym, str)) + (nt_label,)
+    children = []
+    leaves = 0
+    for sym in rhs:
+        if isinstance(sym, str):
+            children.append((_LEAF, leaves))
+            leaves += 1
+        elif isinstance(sym, _Value):
+            children.append((_VALUE, int(sym)))
+        else:
+            children.append((_NODE, sym))
+    return labels, tuple(children)
+
+
+def _add_rule_graph(self, p, labels, topology):
+    """ Adds the nodes and edges of one reduction, of the shape worked
+        out by _rule_shape, and points p[0].ref at the new nt_label
+        node.
+    """
+    ids = self._add_nodes(labels)
+    nid = ids[-1]
+    ref = self._ref
+    src_append = self._edge_src.append
+    dst_append = self._edge_dst.append
+    for kind, n in topology:
+        src_append(nid)
+        if kind == _LEAF:
+            dst_append(ids[n])
+        elif kind == _NODE:
+            dst_append(p[n].ref)
+        else:
+            dst_append(ref(p[n]))
+    p[0].ref = nid
+
+
+def _wrap_rule(build, rule):
+    # yacc reads the production from the docstring and orders the
+    # rules by the line they are defined on
+    rule.__doc__ = build.__doc__
+    rule.__name__ = build.__name__
+    rule.co_firstlineno = build.__code__.co_firstlineno
+    return rule
+
+
+def _make_rule(nt_label, *rhs):
+    """ Makes a decorator for grammar actions whose graph node simply
+        takes every symbol of the production as a child, in order.
+
+        rhs lists those symbols: a string is the label of a new leaf
+        node for a token, an int n stands for the node of p[n] (see
+        _Value for values that are not AST nodes). The decorated
+        action only has to build p[0]; the generated rule then adds
+        the nodes and edges and points p[0].ref at the nt_label node.
+
+        The edge topology is worked out here, once per production, as
+        a constant tuple of (kind, index) pairs, so a reduction only
+        has to fill in the ids.
+    """
+    labels, topology = _rule_shape(nt_label, rhs)
+
+    def decorate(build):
+        def rule(self, p):
+            build(self, p)
+            if not self._build_graph:
+                return
+            _add_rule_graph(self, p, labels, topology)
+        return _wrap_rule(build, rule)
+    return decorate
+
+
+def _make_rules(nt_label, *productions):
+    """ Like _make_rule, for actions covering productions of different
+        lengths: each of productions is the rhs of one of them, as
+        given to _make_rule. A reduction picks its shape from a table
+        keyed by len(p), instead of testing len(p) branch by branch.
+    """
+    shapes = dict((len(rhs) + 1, _rule_shape(nt_label, rhs))
+                  for rhs in productions)
+
+    def decorate(build):
+        def rule(self, p):
+            build(self, p)
+            if not self._build_graph:
+                return
+            labels, topology = shapes[len(p)]
+            _add_rule_graph(self, p, labels, topology)
+        return _wrap_rule(build, rule)
+    return decorate
 
-from ply import yacc
-
-import c_ast
-from c_lexer import CLexer
-from plyparser import PLYParser, Coord, ParseError
-from ast_transforms import fix_switch_cases
-
-# graph = pydot.Dot(graph_type='digraph')
-
-counter = 0
 
 class CParser(PLYParser):
     def __init__(
@@ -26,11 +139,13 @@ class CParser(PLYParser):
             lex_optimize=True,
             lexer=CLexer,
             lextab='pycparser.lextab',
-            yacc_optimize=False,
+            yacc_optimize=None,
             yacctab='pycparser.yacctab',
             yacc_debug=False,
             taboutputdir='',
-            graph=None):
+            yacc_picklefile=None,
+            graph=None,
+            build_graph=False):
         """ Create a new CParser.
 
             Some arguments for controlling the debug/optimization
@@ -66,6 +181,10 @@ class CParser(PLYParser):
                 When releasing with a stable parser, set to True
                 to save the re-generation of the parser table on
                 each run.
+                By default it follows __debug__: tables are trusted
+                as-is when Python runs with -O, and checked against
+                the grammar otherwise, so grammar changes still take
+                effect during development.
 
             yacctab:
                 Points to the yacc table that's used for optimized
@@ -79,10 +198,30 @@ class CParser(PLYParser):
             taboutputdir:
                 Set this parameter to control the location of generated
                 lextab and yacctab files.
+
+            yacc_picklefile:
+                Path of a pickle file to cache the generated parsing
+                tables in, used instead of the yacctab module. Tables
+                are regenerated only when the file is missing or the
+                grammar signature changed, so repeated runs skip the
+                table generation no matter which directory they are
+                started from.
+
+            graph:
+                A pydot graph that each parse adds its parse tree to.
+                Giving one implies build_graph.
+
+            build_graph:
+                Set to True to have parse() also build the parse tree
+                graph: into graph if one is given, or else as DOT text
+                (pydot is not needed then). By default only the AST is
+                built, and the grammar actions record no graph nodes.
         """
+        if yacc_optimize is None:
+            yacc_optimize = not __debug__
 
-        global counter
         self.graph = graph
+        self._build_graph = build_graph or graph is not None
         self.clex = lexer(
             error_func=self._lex_error_func,
             on_lbrace_func=self._lex_on_lbrace_func,
@@ -111,18 +250,18 @@ class CParser(PLYParser):
             'type_qualifier_list',
             'struct_declarator_list'
         ]
-        global counter
         for rule in rules_with_opt:
-            counter = self._create_opt_rule(rule, counter)
-            print "xxxxxxxxxxxxxxxxxx ", rule
+            self._create_opt_rule(rule)
 
         self.cparser = yacc.yacc(
             module=self,
             start='translation_unit_or_empty',
             debug=yacc_debug,
             optimize=yacc_optimize,
+            write_tables=True,
             tabmodule=yacctab,
-            outputdir=taboutputdir)
+            outputdir=taboutputdir,
+            picklefile=yacc_picklefile)
 
         # Stack of scopes for keeping track of symbols. _scope_stack[-1] is
         # the current (topmost) scope. Each scope is a dictionary that
@@ -137,8 +276,24 @@ class CParser(PLYParser):
         # Keeps track of the last token given to yacc (the lookahead token)
         self._last_yielded_token = None
 
+        # Graph nodes and edges recorded during a parse: node labels in
+        # id order, starting from id _node_base, edges as parallel arrays
+        # of (parent, child) ids, plus the id of the shared node that
+        # empty optional values point at. Ids keep counting across
+        # parses, since the nodes of every parse end up in the same
+        # graph.
+        self._node_id = itertools.count()
+        self._node_base = 0
+        self._node_labels = []
+        self._edge_src = array('l')
+        self._edge_dst = array('l')
+        self._empty_ref = None
+
     def parse(self, text, filename='', debuglevel=0):
-        """ Parses C code and returns an AST.
+        """ Parses C code and returns an AST, along with the parse
+            tree graph: the pydot graph given to the constructor, a
+            string of DOT text if there was none, or None if the
+            parser was not asked to build the graph.
 
             text:
                 A string containing the C source code
@@ -154,10 +309,30 @@ class CParser(PLYParser):
         self.clex.reset_lineno()
         self._scope_stack = [dict()]
         self._last_yielded_token = None
-        return self.cparser.parse(
+        self._coord_cache = {}
+        if self._build_graph:
+            self._node_base = self._empty_ref = next(self._node_id)
+            self._node_labels = ['empty']
+            self._edge_src = array('l')
+            self._edge_dst = array('l')
+        ast = self.cparser.parse(
                 input=text,
                 lexer=self.clex,
-                debug=debuglevel), self.graph
+                debug=debuglevel)
+        if not self._build_graph:
+            return ast, None
+        if self.graph is None:
+            chunks = ['digraph G {\n']
+            self._write_dot(chunks.append)
+            chunks.append('}\n')
+            graph = ''.join(chunks)
+        else:
+            self._flush_graph()
+            graph = self.graph
+        self._node_labels = []
+        self._edge_src = array('l')
+        self._edge_dst = array('l')
+        return ast, graph
 
     ######################--   PRIVATE   --######################
 
@@ -222,6 +397,134 @@ class CParser(PLYParser):
         """
         return self.clex.last_token
 
+    def _ref(self, x):
+        """ Returns the id of the graph node a grammar value is
+            attached to. Lists carry it as their last element,
+            declaration specifier dicts under "ref", and AST nodes in
+            their ref attribute. Missing optional values all share a
+            single "empty" node.
+        """
+        t = type(x)
+        if t is list:
+            return x[-1]
+        if t is dict:
+            return x["ref"]
+        if x is None:
+            return self._empty_ref
+        return x.ref
+
+    def _add_node(self, label):
+        """ Records a graph node with the given label and returns its
+            id.
+
+            Ids are handed out consecutively, so only the labels are
+            buffered while parsing, and the id of each is implied by
+            its position. They are only written out once the parse is
+            done, by _write_dot or _flush_graph.
+
+            When the parser does not build the graph, nothing is
+            recorded and every node gets id 0.
+        """
+        if not self._build_graph:
+            return 0
+        self._node_labels.append(label)
+        return next(self._node_id)
+
+    def _add_nodes(self, labels):
+        """ Records one graph node per label, in order, and returns the
+            list of their ids.
+        """
+        if not self._build_graph:
+            return [0] * len(labels)
+        node_id = self._node_id
+        self._node_labels.extend(labels)
+        return [next(node_id) for label in labels]
+
+    def _add_parent_node(self, label, *children):
+        """ Adds a node with the given node ids as its children, in
+            order, and returns the id of the new node.
+        """
+        nid = self._add_node(label)
+        if self._build_graph:
+            self._edge_src.extend([nid] * len(children))
+            self._edge_dst.extend(children)
+        return nid
+
+    def _add_token_node(self, token_label, nt_label):
+        """ Adds a leaf node for a token and a nt_label node above it,
+            and returns the id of the latter.
+        """
+        return self._add_parent_node(nt_label, self._add_node(token_label))
+
+    def _add_binop_node(self, label, left, right):
+        """ Adds a binary_expression node over the given operand node
+            ids, and returns its id. The operator is part of the label
+            rather than a leaf of its own.
+        """
+        return self._add_parent_node(label, left, right)
+
+    def _add_edge(self, parent, child):
+        """ Records a graph edge between two node ids.
+
+            Edges are buffered as two flat arrays of ids while
+            parsing, and only written out once the parse is done.
+        """
+        if not self._build_graph:
+            return
+        self._edge_src.append(parent)
+        self._edge_dst.append(child)
+
+    def _add_edges(self, edges):
+        """ Records a graph edge for each (parent, child) pair of ids.
+        """
+        if not self._build_graph:
+            return
+        src_append = self._edge_src.append
+        dst_append = self._edge_dst.append
+        for parent, child in edges:
+            src_append(parent)
+            dst_append(child)
+
+    def _node_names(self):
+        """ Returns the DOT names of the buffered nodes, in id order.
+
+            Every edge of a parse joins two nodes of that same parse,
+            so each name is formatted once and the edges look theirs up
+            by position.
+        """
+        base = self._node_base
+        return ['node_%d' % nid
+                for nid in range(base, base + len(self._node_labels))]
+
+    def _write_dot(self, write):
+        """ Writes the buffered nodes and edges as DOT statements, with
+            one write(text) call per node and per edge.
+        """
+        base = self._node_base
+        names = self._node_names()
+        for name, label in zip(names, self._node_labels):
+            write('%s [label="%s"];\n' % (name, label))
+        for parent, child in zip(self._edge_src, self._edge_dst):
+            write('%s -> %s;\n' % (names[parent - base], names[child - base]))
+
+    def _flush_graph(self):
+        """ Moves the buffered nodes and edges into the pydot graph
+            given to the constructor.
+
+            pydot is only imported here, so that parsing, with or
+            without the DOT text graph, does not need it.
+        """
+        import pydot
+        base = self._node_base
+        names = self._node_names()
+        Node, Edge = pydot.Node, pydot.Edge
+        add_node = self.graph.add_node
+        for name, label in zip(names, self._node_labels):
+            add_node(Node(name, label=label))
+        add_edge = self.graph.add_edge
+        for parent, child in zip(self._edge_src, self._edge_dst):
+            add_edge(Edge(names[parent - base], names[child - base]))
+
     # To understand what's going on here, read sections A.8.5 and
     # A.8.6 of K&R2 very carefully.
     #
@@ -426,11 +729,9 @@ class CParser(PLYParser):
                 decls_0_tail.declname = spec['type'][-1].names[0]
                 del spec['type'][-1]
 
-        print "decls is: ", decls        
         for decl in decls:
-            if "node_" in decl:
+            if not isinstance(decl, dict):
                 continue
-            print "decl is: ", decl
             assert decl['decl'] is not None
             if is_typedef:
                 declaration = c_ast.Typedef(
@@ -450,12 +751,10 @@ class CParser(PLYParser):
                     bitsize=decl.get('bitsize'),
                     coord=decl['decl'].coord)
 
-            print "declaration is: ", declaration
             if isinstance(declaration.type,
                     (c_ast.Struct, c_ast.Union, c_ast.IdentifierType)):
                 fixed_decl = declaration
             else:
-                print "reached else."
                 fixed_decl = self._fix_decl_name_type(declaration, spec['type'])
 
             # Add the type name defined by typedef to a
@@ -524,41 +823,22 @@ class CParser(PLYParser):
         """ translation_unit_or_empty   : translation_unit
                                         | empty
         """
-        print "HOLA"
-        global counter
         if p[1] is None:
             p[0] = c_ast.FileAST([])
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='empty'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='translation_unit_or_empty'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            p[0].ref = 'node_'+str(counter-1)
+            nid = self._add_token_node('empty', 'translation_unit_or_empty')
+            p[0].ref = nid
         else:
             x = p[1].pop()
             p[0] = c_ast.FileAST(p[1])
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='translation_unit_or_empty'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), x)
-            self.graph.add_edge(edge)
-            p[0].ref = 'node_'+str(counter-1)
-        print "function-1: ", counter
+            p[0].ref = self._add_parent_node('translation_unit_or_empty', x)
 
     def p_translation_unit_1(self, p):
         """ translation_unit    : external_declaration
         """
         # Note: external_declaration is already a list
         #
-        global counter
         p[0] = p[1]
-        length = len(p[1]);
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='translation_unit'))
-        counter = counter+1
-        edge = pydot.Edge('node_'+str(counter-1), p[1][length-1])
-        self.graph.add_edge(edge)
-        p[0][length-1] = 'node_'+str(counter-1)
-        print "function-2: ", counter
+        p[0][-1] = self._add_parent_node('translation_unit', p[1][-1])
 
     def p_translation_unit_2(self, p):
         """ translation_unit    : translation_unit external_declaration
@@ -568,15 +848,8 @@ class CParser(PLYParser):
         if p[2] is not None:
             p[1].extend(p[2])
         p[0] = p[1]
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='translation_unit'))
-        counter = counter+1
-        edge = pydot.Edge('node_'+str(counter-1), x)
-        self.graph.add_edge(edge)
-        edge = pydot.Edge('node_'+str(counter-1), y)
-        self.graph.add_edge(edge)
-        p[0].append('node_'+str(counter-1)) 
-        print "function-3: ", counter
+        nid = self._add_parent_node('translation_unit', x, y)
+        p[0].append(nid)
     # Declarations always come as lists (because they can be
     # several in one line), so we wrap the function definition
     # into a list as well, to make the return value of
@@ -585,28 +858,14 @@ class CParser(PLYParser):
     def p_external_declaration_1(self, p):
         """ external_declaration    : function_definition
         """
-        global counter
         p[0] = [p[1]]
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='external_declaration'))
-        counter = counter+1
-        edge = pydot.Edge('node_'+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge)
-        p[0].append('node_'+str(counter-1)) 
-        print "function-4: ", counter
+        p[0].append(self._add_parent_node('external_declaration', p[1].ref))
 
     def p_external_declaration_2(self, p):
         """ external_declaration    : declaration
         """
-        global counter
         p[0] = p[1]
-
-        length = len(p[1])
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='external_declaration'))
-        counter = counter+1
-        edge = pydot.Edge('node_'+str(counter-1), p[1][length-1])
-        self.graph.add_edge(edge)
-        p[0][length-1] = 'node_'+str(counter-1)
-        print "function-5: ", counter
+        p[0][-1] = self._add_parent_node('external_declaration', p[1][-1])
 
     def p_external_declaration_3(self, p):
         """ external_declaration    : pp_directive
@@ -615,62 +874,37 @@ class CParser(PLYParser):
         p[0] = [p[1]]
         self._parse_error('Directives not supported yet',
                           self._coord(p.lineno(1)))
-        print "function-6: ", counter
 
     def p_external_declaration_4(self, p):
         """ external_declaration    : SEMI
         """
-        # print "HOQWEE"
-        global counter
-        p[0] = None
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='SEMI'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='external_declaration'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0] = ['@node_'+str(counter-1)];
-        print "function-7: ", counter
+        p[0] = [self._add_token_node('SEMI', 'external_declaration')]
 
     def p_pp_directive(self, p):
         """ pp_directive  : PPHASH
         """
         self._parse_error('Directives not supported yet',
                           self._coord(p.lineno(1)))
-        print "function-8: ", counter
 
     def p_pppragma_directive(self, p):
         """ pppragma_directive      : PPPRAGMA
                                     | PPPRAGMA PPPRAGMASTR
         """
-        global counter
         if len(p) == 3:
             p[0] = c_ast.Pragma(p[2], self._coord(p.lineno(2)))
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='PPPRAGMA'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='PPPRAGMASTR'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='pppragma_directive'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            p[0].ref = 'node_'+str(counter-1)
+            pppragma, pppragmastr = self._add_nodes(
+                ['PPPRAGMA', 'PPPRAGMASTR'])
+            p[0].ref = self._add_parent_node(
+                'pppragma_directive', pppragma, pppragmastr)
         else:
             p[0] = c_ast.Pragma("", self._coord(p.lineno(1)))
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='PPPRAGMA'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='pppragma_directive'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            p[0].ref = 'node_'+str(counter-1)
-        print "function-9: ", counter
+            nid = self._add_token_node('PPPRAGMA', 'pppragma_directive')
+            p[0].ref = nid
 
     # In function definitions, the declarator can be followed by
     # a declaration list, for old "K&R style" function definitios.
     #
+    @_make_rule('function_definition', 1, _Value(2), 3)
     def p_function_definition_1(self, p):
         """ function_definition : declarator declaration_list_opt compound_statement
         """
@@ -682,69 +916,27 @@ class CParser(PLYParser):
                                        coord=self._coord(p.lineno(1)))],
             function=[])
 
-        global counter
         p[0] = self._build_function_definition(
             spec=spec,
             decl=p[1],
             param_decls=p[2],
             body=p[3])
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='function_definition'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge)
-        if isinstance(p[2], list):
-            length = len(p[2])
-            edge = pydot.Edge("node_"+str(counter-1), p[2][length-1])
-        elif isinstance(p[2], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[2]["ref"])
-        elif p[2] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-        self.graph.add_edge(edge)
-        p[0].ref = "node_" + str(counter-1)
-        print "function-10: ", counter
-        
-        
-
 
     def p_function_definition_2(self, p):
         """ function_definition : declaration_specifiers declarator declaration_list_opt compound_statement
         """
         spec = p[1]
 
-
         p[0] = self._build_function_definition(
             spec=spec,
             decl=p[2],
             param_decls=p[3],
             body=p[4])
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='function_definition'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1]["ref"])
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        self.graph.add_edge(edge)
-        if isinstance(p[3], list):
-            length = len(p[3])
-            edge = pydot.Edge("node_"+str(counter-1), p[3][length-1])
-        elif isinstance(p[3], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[3]["ref"])
-        elif p[3] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), p[4].ref)
-        self.graph.add_edge(edge)
-        p[0].ref = "node_" + str(counter-1)
-        print "function-11: ", counter
-
-        print "fucntion definitoon 2", type(p[0]), type(p[1]), type(p[2]), type(p[3])
+        p[0].ref = self._add_parent_node(
+            'function_definition', p[1]["ref"], p[2].ref, self._ref(p[3]),
+            p[4].ref)
+
+    @_make_rule('statement', 1)
     def p_statement(self, p):
         """ statement   : labeled_statement
                         | expression_statement
@@ -754,17 +946,7 @@ class CParser(PLYParser):
                         | jump_statement
                         | pppragma_directive
         """
-        # print "HOOOOLALAALALLALALALAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA"
         p[0] = p[1]
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='statement'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge)
-        p[0].ref = "node_" + str(counter-1)
-    print "function-12: ", counter
-
-        
 
     # In C, declarations can come several in a line:
     #   int x, *px, romulo = 5;
@@ -779,7 +961,6 @@ class CParser(PLYParser):
         """ decl_body : declaration_specifiers init_declarator_list_opt
         """
         spec = p[1]
-        print "hfggggggggggggggggggggggggggg", type(p[2]), p[2]
 
         # p[2] (init_declarator_list_opt) is either a list or None
         #
@@ -811,8 +992,6 @@ class CParser(PLYParser):
                     spec=spec,
                     decls=[dict(decl=None, init=None)],
                     typedef_namespace=True)
-        
-
         else:
             decls = self._build_declarations(
                 spec=spec,
@@ -820,23 +999,8 @@ class CParser(PLYParser):
                 typedef_namespace=True)
 
         p[0] = decls
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='decl_body'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1]["ref"])
-        self.graph.add_edge(edge)
-        if isinstance(p[2], list):
-            length = len(p[2])
-            edge = pydot.Edge("node_"+str(counter-1), p[2][length-1])
-        elif isinstance(p[2], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[2]["ref"])
-        elif p[2] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge)
-        p[0].append("node_" + str(counter-1))
-        print "function-13: ", counter
+        nid = self._add_parent_node('decl_body', p[1]["ref"], self._ref(p[2]))
+        p[0].append(nid)
 
 
     # The declaration has been split to a decl_body sub-rule and
@@ -858,20 +1022,10 @@ class CParser(PLYParser):
         """ declaration : decl_body SEMI
         """
         p[0] = p[1]
-        global counter
-        length = len(p[1])
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='SEMI'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='declaration'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1][length-1])
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_" + str(counter-2))
-        self.graph.add_edge(edge)
-        p[0].append("node_" + str(counter-1))
-        print "function-14: ", counter
-        
-        
+        semi = self._add_node('SEMI')
+        nid = self._add_parent_node('declaration', p[1][-1], semi)
+        p[0].append(nid)
+
     # Since each declaration is a list of declarations, this
     # rule will combine all the declarations and return a single
     # list
@@ -881,120 +1035,39 @@ class CParser(PLYParser):
                                 | declaration_list declaration
         """
         p[0] = p[1] if len(p) == 2 else p[1] + p[2]
-        global counter
         if len(p) == 2:
-            length = len(p[1])
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='declaration_list'))
-            counter = counter+1  
-            edge = pydot.Edge("node_"+str(counter-1), p[1][length-1])
-            self.graph.add_edge(edge)
+            nid = self._add_parent_node('declaration_list', p[1][-1])
         else:
-            length = len(p[2])
-            length1 = len(p[1])
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='declaration_list'))
-            counter = counter+1  
-            edge = pydot.Edge("node_"+str(counter-1), p[1][length1-1])
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), p[2][length-1])
-            self.graph.add_edge(edge)
-        p[0].append("node_" + str(counter-1))
-        print "function-15: ", counter
+            nid = self._add_parent_node('declaration_list', p[1][-1], p[2][-1])
+        p[0].append(nid)
 
     def p_declaration_specifiers_1(self, p):
         """ declaration_specifiers  : type_qualifier declaration_specifiers_opt
         """
-        tmp_node1 = p[1].split("@")
-        p[1] = tmp_node1[0]
-        p[0] = self._add_declaration_specifier(p[2], p[1], 'qual')
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='declaration_specifiers'))
-        counter = counter+1        
-        edge = pydot.Edge("node_"+str(counter-1), tmp_node1[1])
-        self.graph.add_edge(edge)
-        if isinstance(p[2], list):
-            length = len(p[2])
-            edge = pydot.Edge("node_"+str(counter-1), p[2][length-1])
-        elif isinstance(p[2], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[2]["ref"])
-        elif p[2] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge)
-        p[0]["ref"] = "node_" + str(counter-1)
-        print "function-16: ", counter
+        p[0] = self._add_declaration_specifier(p[2], p[1].value, 'qual')
+        p[0]["ref"] = self._add_parent_node(
+            'declaration_specifiers', p[1].ref, self._ref(p[2]))
 
     def p_declaration_specifiers_2(self, p):
         """ declaration_specifiers  : type_specifier declaration_specifiers_opt
         """
-        # tmp_node1 = p[1].split("@")
-        # p[1] = tmp_node1[0]
         p[0] = self._add_declaration_specifier(p[2], p[1], 'type')
-        global counter      
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='declaration_specifiers'))
-        counter = counter+1        
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge)
-        if isinstance(p[2], list):
-            length = len(p[2])
-            edge = pydot.Edge("node_"+str(counter-1), p[2][length-1])
-        elif isinstance(p[2], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[2]["ref"])
-        elif p[2] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge)
-        p[0]["ref"] = "node_" + str(counter-1)
-        print "function-17: ", counter
+        p[0]["ref"] = self._add_parent_node(
+            'declaration_specifiers', p[1].ref, self._ref(p[2]))
 
     def p_declaration_specifiers_3(self, p):
         """ declaration_specifiers  : storage_class_specifier declaration_specifiers_opt
         """
-        tmp_node1 = p[1].split("@")
-        p[1] = tmp_node1[0]
-        p[0] = self._add_declaration_specifier(p[2], p[1], 'storage')
-        global counter      
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='declaration_specifiers'))
-        counter = counter+1        
-        edge = pydot.Edge("node_"+str(counter-1), tmp_node1[1])
-        self.graph.add_edge(edge)
-        if isinstance(p[2], list):
-            length = len(p[2])
-            edge = pydot.Edge("node_"+str(counter-1), p[2][length-1])
-        elif isinstance(p[2], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[2]["ref"])
-        elif p[2] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge)
-        p[0]["ref"] = "node_" + str(counter-1)
-        print "function-18: ", counter
+        p[0] = self._add_declaration_specifier(p[2], p[1].value, 'storage')
+        p[0]["ref"] = self._add_parent_node(
+            'declaration_specifiers', p[1].ref, self._ref(p[2]))
 
     def p_declaration_specifiers_4(self, p):
         """ declaration_specifiers  : function_specifier declaration_specifiers_opt
         """
-        tmp_node1 = p[1].split("@")
-        p[1] = tmp_node1[0]
-        p[0] = self._add_declaration_specifier(p[2], p[1], 'function')
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='declaration_specifiers'))
-        counter = counter+1        
-        edge = pydot.Edge("node_"+str(counter-1), tmp_node1[1])
-        self.graph.add_edge(edge)
-        if isinstance(p[2], list):
-            length = len(p[2])
-            edge = pydot.Edge("node_"+str(counter-1), p[2][length-1])
-        elif isinstance(p[2], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[2]["ref"])
-        elif p[2] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge)
-        p[0]["ref"] = "node_" + str(counter-1)
-        print "function-19: ", counter
+        p[0] = self._add_declaration_specifier(p[2], p[1].value, 'function')
+        p[0]["ref"] = self._add_parent_node(
+            'declaration_specifiers', p[1].ref, self._ref(p[2]))
 
     def p_storage_class_specifier(self, p):
         """ storage_class_specifier : AUTO
@@ -1003,42 +1076,25 @@ class CParser(PLYParser):
                                     | EXTERN
                                     | TYPEDEF
         """
-        global counter
-        p[0] = p[1]
-        # print "TEST@@@@: ", p[1];
         if p[1] == 'auto':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='AUTO'))
+            tok = self._add_node('AUTO')
         elif p[1] == 'register':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='REGISTER'))
+            tok = self._add_node('REGISTER')
         elif p[1] == 'static':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='STATIC'))
+            tok = self._add_node('STATIC')
         elif p[1] == 'extern':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='EXTERN'))
+            tok = self._add_node('EXTERN')
         else:
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='TYPEDEF'))
-        
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='storage_class_specifier'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0] = p[0] + '@node_' + str(counter-1)
-        print "function-20: ", counter
+            tok = self._add_node('TYPEDEF')
+        nid = self._add_parent_node('storage_class_specifier', tok)
+        p[0] = _Token(p[1], nid)
 
 
     def p_function_specifier(self, p):
         """ function_specifier  : INLINE
         """
-        global counter
-        p[0] = p[1]
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='INLINE'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='function_specifier'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0] = p[0] + '@node_' + str(counter-1)
-        print "function-21: ", counter
+        nid = self._add_token_node('INLINE', 'function_specifier')
+        p[0] = _Token(p[1], nid)
 
 
     def p_type_specifier_1(self, p):
@@ -1055,104 +1111,67 @@ class CParser(PLYParser):
                             | UNSIGNED
                             | __INT128
         """
-        global counter
         p[0] = c_ast.IdentifierType([p[1]], coord=self._coord(p.lineno(1)))
         if p[1] == 'void':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='VOID'))
+            tok = self._add_node('VOID')
         elif p[1] == '_Bool':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='_BOOL'))
+            tok = self._add_node('_BOOL')
         elif p[1] == 'char':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='CHAR'))
+            tok = self._add_node('CHAR')
         elif p[1] == 'short':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='SHORT'))
+            tok = self._add_node('SHORT')
         elif p[1] == 'int':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='INT'))
+            tok = self._add_node('INT')
         elif p[1] == 'long':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='LONG'))
+            tok = self._add_node('LONG')
         elif p[1] == 'float':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='FLOAT'))
+            tok = self._add_node('FLOAT')
         elif p[1] == 'double':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='DOUBLE'))
+            tok = self._add_node('DOUBLE')
         elif p[1] == '_Complex':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='_COMPLEX'))
+            tok = self._add_node('_COMPLEX')
         elif p[1] == 'signed':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='SIGNED'))
+            tok = self._add_node('SIGNED')
         elif p[1] == 'unsigned':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='UNSIGNED'))
+            tok = self._add_node('UNSIGNED')
         else:
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='_INT128'))
-
-        counter = counter + 1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='type_specifier'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0].ref = "node_"+str(counter-1)
-        # print "TEDSTKJJ ", p[1]
-        print "function-22: ", counter
+            tok = self._add_node('_INT128')
+        p[0].ref = self._add_parent_node('type_specifier', tok)
 
+    @_make_rule('specifier', 1)
     def p_type_specifier_2(self, p):
         """ type_specifier  : typedef_name
                             | enum_specifier
                             | struct_or_union_specifier
         """
-        global counter
         p[0] = p[1]
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='specifier'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge)
-        p[0].ref = "node_"+str(counter-1)
-        print "function-23: ", counter
 
     def p_type_qualifier(self, p):
         """ type_qualifier  : CONST
                             | RESTRICT
                             | VOLATILE
         """
-        global counter
-        p[0] = p[1]
         if p[1] == 'const':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='CONST'))
+            tok = self._add_node('CONST')
         elif p[1] == 'restrict':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='RESTRICT'))
+            tok = self._add_node('RESTRICT')
         else:
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='VOLATILE'))
-        counter = counter + 1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='type_qualifier'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0] = p[0] + '@node_' + str(counter-1)
-        # print "TERSR ",p[1];
-        print "function-24: ", counter
+            tok = self._add_node('VOLATILE')
+        p[0] = _Token(p[1], self._add_parent_node('type_qualifier', tok))
 
     def p_init_declarator_list_1(self, p):
         """ init_declarator_list    : init_declarator
                                     | init_declarator_list COMMA init_declarator
         """
-        global counter
         p[0] = p[1] + [p[3]] if len(p) == 4 else [p[1]]
         if len(p) == 2:
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='init_declarator_list'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1]["ref"])
-            self.graph.add_edge(edge)
-            p[0].append("node_"+str(counter-1))
+            p[0].append(self._add_parent_node(
+                'init_declarator_list', p[1]["ref"]))
         else:
-            length = len(p[1])
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='COMMA'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='init_declarator_list'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1][length-1])
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), p[3]["ref"])
-            self.graph.add_edge(edge)
-            p[0].append("node_"+str(counter-1))
-        print "function-25: ", counter
+            comma = self._add_node('COMMA')
+            nid = self._add_parent_node(
+                'init_declarator_list', p[1][-1], comma, p[3]["ref"])
+            p[0].append(nid)
 
     # If the code is declaring a variable that was declared a typedef in an
     # outer scope, yacc will think the name is part of declaration_specifiers,
@@ -1163,16 +1182,9 @@ class CParser(PLYParser):
         """ init_declarator_list    : EQUALS initializer
         """
         p[0] = [dict(decl=None, init=p[2])]
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='EQUALS'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='init_declarator_list'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        self.graph.add_edge(edge)
-        p[0].append("node_"+str(counter-1))
-        print "function-26: ", counter
+        nid = self._add_token_node('EQUALS', 'init_declarator_list')
+        self._add_edge(nid, p[2].ref)
+        p[0].append(nid)
 
     # Similarly, if the code contains duplicate typedefs of, for example,
     # array types, the array portion will appear as an abstract declarator.
@@ -1181,12 +1193,7 @@ class CParser(PLYParser):
         """ init_declarator_list    : abstract_declarator
         """
         p[0] = [dict(decl=p[1], init=None)]
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='init_declarator_list'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge)
-        p[0].append("node_"+str(counter-1))
-        print "function-27: ", counter
+        p[0].append(self._add_parent_node('init_declarator_list', p[1].ref))
 
     # Returns a {decl=<declarator> : init=<initializer>} dictionary
     # If there's no initializer, uses None
@@ -1195,73 +1202,27 @@ class CParser(PLYParser):
         """ init_declarator : declarator
                             | declarator EQUALS initializer
         """
-        global counter
         p[0] = dict(decl=p[1], init=(p[3] if len(p) > 2 else None))
         if len(p) == 2:
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='init_declarator'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge)
-            p[0]["ref"] = "node_"+str(counter-1)
+            p[0]["ref"] = self._add_parent_node('init_declarator', p[1].ref)
         else:
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='EQUALS'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='init_declarator'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-            self.graph.add_edge(edge)
-            p[0]["ref"] = "node_"+str(counter-1)
-        print "function-28: ", counter
+            equals = self._add_node('EQUALS')
+            p[0]["ref"] = self._add_parent_node(
+                'init_declarator', p[1].ref, equals, p[3].ref)
 
     def p_specifier_qualifier_list_1(self, p):
         """ specifier_qualifier_list    : type_qualifier specifier_qualifier_list_opt
         """
-        global counter
-        tmp_node1 = p[1].split("@")
-        p[1] = tmp_node1[0]
-        p[0] = self._add_declaration_specifier(p[2], p[1], 'qual')
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='specifier_qualifier_list'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), tmp_node1[1])
-        self.graph.add_edge(edge)
-        if isinstance(p[2], list):
-            length = len(p[2])
-            edge = pydot.Edge("node_"+str(counter-1), p[2][length-1])
-        elif isinstance(p[2], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[2]["ref"])
-        elif p[2] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge)
-        p[0]["ref"] = "node_"+str(counter-1)
-        print "function-29: ", counter
+        p[0] = self._add_declaration_specifier(p[2], p[1].value, 'qual')
+        p[0]["ref"] = self._add_parent_node(
+            'specifier_qualifier_list', p[1].ref, self._ref(p[2]))
 
     def p_specifier_qualifier_list_2(self, p):
         """ specifier_qualifier_list    : type_specifier specifier_qualifier_list_opt
         """
-        global counter
         p[0] = self._add_declaration_specifier(p[2], p[1], 'type')
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='specifier_qualifier_list'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge)
-        if isinstance(p[2], list):
-            length = len(p[2])
-            edge = pydot.Edge("node_"+str(counter-1), p[2][length-1])
-        elif isinstance(p[2], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[2]["ref"])
-        elif p[2] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge)
-        p[0]["ref"] = "node_"+str(counter-1)
-        print "function-30: ", counter
+        p[0]["ref"] = self._add_parent_node(
+            'specifier_qualifier_list', p[1].ref, self._ref(p[2]))
 
     # TYPEID is allowed here (and in other struct/enum related tag names), because
     # struct/enum tags reside in their own namespace and can be named the same as types
@@ -1270,114 +1231,51 @@ class CParser(PLYParser):
         """ struct_or_union_specifier   : struct_or_union ID
                                         | struct_or_union TYPEID
         """
-        global counter
-        tmp_node1 = p[1].split("@")
-        p[1] = tmp_node1[0]
-        klass = self._select_struct_union_class(p[1])
+        klass = self._select_struct_union_class(p[1].value)
         p[0] = klass(
             name=p[2],
             decls=None,
             coord=self._coord(p.lineno(2)))
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='TYPEID/ID'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='struct_or_union_specifier'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), tmp_node1[1])
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0].ref = "node_"+str(counter-1)
-        print "function-31: ", counter
-        
+        typeid_id = self._add_node('TYPEID/ID')
+        p[0].ref = self._add_parent_node(
+            'struct_or_union_specifier', p[1].ref, typeid_id)
 
     def p_struct_or_union_specifier_2(self, p):
         """ struct_or_union_specifier : struct_or_union brace_open struct_declaration_list brace_close
         """
-        global counter
-        tmp_node1 = p[1].split("@")
-        p[1] = tmp_node1[0]
-        tmp_node2 = p[2].split("@")
-        p[2] = tmp_node2[0]
-        tmp_node3 = p[4].split("@")
-        p[4] = tmp_node3[0]
-        klass = self._select_struct_union_class(p[1])
+        klass = self._select_struct_union_class(p[1].value)
         p[0] = klass(
             name=None,
             decls=p[3],
             coord=self._coord(p.lineno(2)))
-        length = len(p[3])
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='struct_or_union_specifier'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), tmp_node1[1])
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), tmp_node2[1])
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), p[3][length-1])
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), tmp_node3[1])
-        self.graph.add_edge(edge)
-        p[0].ref = "node_"+str(counter-1)
-        print "function-32: ", counter
+        p[0].ref = self._add_parent_node(
+            'struct_or_union_specifier', p[1].ref, p[2].ref, p[3][-1],
+            p[4].ref)
 
     def p_struct_or_union_specifier_3(self, p):
         """ struct_or_union_specifier   : struct_or_union ID brace_open struct_declaration_list brace_close
                                         | struct_or_union TYPEID brace_open struct_declaration_list brace_close
         """
-        global counter
-        tmp_node1 = p[1].split("@")
-        p[1] = tmp_node1[0]
-        tmp_node2 = p[3].split("@")
-        p[3] = tmp_node2[0]
-        tmp_node3 = p[5].split("@")
-        p[5] = tmp_node3[0]
-        klass = self._select_struct_union_class(p[1])
+        klass = self._select_struct_union_class(p[1].value)
         p[0] = klass(
             name=p[2],
             decls=p[4],
             coord=self._coord(p.lineno(2)))
-        length = len(p[4])
-    
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='ID/TYPEID'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='struct_or_union_specifier'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), tmp_node1[1])
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), tmp_node2[1])
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), p[4][length-1])
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), tmp_node3[1])
-        self.graph.add_edge(edge)
-        p[0].ref = "node_"+str(counter-1)
-        print "function-33: ", counter
+        id_typeid = self._add_node('ID/TYPEID')
+        p[0].ref = self._add_parent_node(
+            'struct_or_union_specifier', p[1].ref, id_typeid,
+            p[3].ref, p[4][-1], p[5].ref)
 
 
     def p_struct_or_union(self, p):
         """ struct_or_union : STRUCT
                             | UNION
         """
-        global counter
-        p[0] = p[1]
         if p[1] == 'struct':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='STRUCT'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='struct_or_union'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            p[0] = p[0] + '@node_'+str(counter-1)
+            nid = self._add_token_node('STRUCT', 'struct_or_union')
         else:
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='UNION'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='struct_or_union'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            p[0] = p[0] + '@node_'+str(counter-1)
-        print "function-34: ", counter
+            nid = self._add_token_node('UNION', 'struct_or_union')
+        p[0] = _Token(p[1], nid)
 
     # Combine all declarations into a single list
     #
@@ -1385,40 +1283,27 @@ class CParser(PLYParser):
         """ struct_declaration_list     : struct_declaration
                                         | struct_declaration_list struct_declaration
         """
-        global counter
         if len(p) == 2:
             tmp_node = ''
             if len(p[1]) == 1:
                 tmp_node = p[1][0]
                 p[1] = None
             else:
-                length = len(p[1])
-                tmp_node = p[1][length-1]
+                tmp_node = p[1][-1]
             p[0] = p[1] or []
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='struct_declaration_list'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), tmp_node)
-            self.graph.add_edge(edge)
-            p[0].append('node_'+str(counter-1))
+            p[0].append(self._add_parent_node(
+                'struct_declaration_list', tmp_node))
         else:
             tmp_node = ''
             if len(p[2]) == 1:
                 tmp_node = p[2][0]
                 p[2] = None
             else:
-                length = len(p[2])
-                tmp_node = p[2][length-1]
+                tmp_node = p[2][-1]
             x = p[1].pop()
             p[0] = p[1] + (p[2] or [])
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='struct_declaration_list'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), x)
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), tmp_node)
-            self.graph.add_edge(edge)
-            p[0].append('node_'+str(counter-1))
-        print "function-35: ", counter
-            
+            nid = self._add_parent_node('struct_declaration_list', x, tmp_node)
+            p[0].append(nid)
 
     def p_struct_declaration_1(self, p):
         """ struct_declaration : specifier_qualifier_list struct_declarator_list_opt SEMI
@@ -1457,27 +1342,10 @@ class CParser(PLYParser):
                 decls=[dict(decl=None, init=None)])
 
         p[0] = decls
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='SEMI'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='struct_declaration'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1]["ref"])
-        self.graph.add_edge(edge)
-        if isinstance(p[2], list):
-            length = len(p[2])
-            edge = pydot.Edge("node_"+str(counter-1), p[2][length-1])
-        elif isinstance(p[2], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[2]["ref"])
-        elif p[2] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0].append('node_'+str(counter-1))
-        print "function-36: ", counter
+        semi = self._add_node('SEMI')
+        nid = self._add_parent_node(
+            'struct_declaration', p[1]["ref"], self._ref(p[2]), semi)
+        p[0].append(nid)
 
     def p_struct_declaration_2(self, p):
         """ struct_declaration : specifier_qualifier_list abstract_declarator SEMI
@@ -1492,65 +1360,32 @@ class CParser(PLYParser):
         p[0] = self._build_declarations(
                 spec=p[1],
                 decls=[dict(decl=p[2], init=None)])
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='SEMI'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='struct_declaration'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1]["ref"])
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0].append('node_'+str(counter-1))
-        print "function-37: ", counter
+        semi = self._add_node('SEMI')
+        nid = self._add_parent_node(
+            'struct_declaration', p[1]["ref"], p[2].ref, semi)
+        p[0].append(nid)
 
     def p_struct_declaration_3(self, p):
         """ struct_declaration : SEMI
         """
-        global counter
         p[0] = None
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='SEMI'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='struct_declaration'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0] = ['node_'+str(counter-1)]
-        print "function-38: ", counter
+        nid = self._add_token_node('SEMI', 'struct_declaration')
+        p[0] = [nid]
 
     def p_struct_declarator_list(self, p):
         """ struct_declarator_list  : struct_declarator
                                     | struct_declarator_list COMMA struct_declarator
         """
-        global counter
         if len(p) == 4:
             p[0] = p[1] + [p[3]]
-            length = len(p[1])
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='COMMA'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='struct_declarator_list'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1][length-1])
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), p[3]["ref"])
-            self.graph.add_edge(edge)
-            p[0].append("node_"+str(counter-1))
+            comma = self._add_node('COMMA')
+            nid = self._add_parent_node(
+                'struct_declarator_list', p[1][-1], comma, p[3]["ref"])
+            p[0].append(nid)
         else:
             p[0] = [p[1]]
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='struct_declarator_list'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1]["ref"])
-            self.graph.add_edge(edge)
-            p[0].append("node_"+str(counter-1))
-            print "p[0]", p[0]
-
-        # p[0] = p[1] + [p[3]] if len(p) == 4 else [p[1]]
-        print "function-39: ", counter
-
+            p[0].append(self._add_parent_node(
+                'struct_declarator_list', p[1]["ref"]))
 
     # struct_declarator passes up a dict with the keys: decl (for
     # the underlying declarator) and bitsize (for the bitsize)
@@ -1558,232 +1393,110 @@ class CParser(PLYParser):
     def p_struct_declarator_1(self, p):
         """ struct_declarator : declarator
         """
-        global counter
         p[0] = {'decl': p[1], 'bitsize': None}
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='struct_declarator'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge)
-        p[0]["ref"] = "node_"+str(counter-1)
-        print "function-40: ", counter
+        p[0]["ref"] = self._add_parent_node('struct_declarator', p[1].ref)
 
     def p_struct_declarator_2(self, p):
         """ struct_declarator   : declarator COLON constant_expression
                                 | COLON constant_expression
         """
-        global counter
         if len(p) > 3:
             p[0] = {'decl': p[1], 'bitsize': p[3]}
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='COLON'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='struct_declarator'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-            self.graph.add_edge(edge)
-            p[0]["ref"] = "node_"+str(counter-1)
+            colon = self._add_node('COLON')
+            p[0]["ref"] = self._add_parent_node(
+                'struct_declarator', p[1].ref, colon, p[3].ref)
         else:
             p[0] = {'decl': c_ast.TypeDecl(None, None, None), 'bitsize': p[2]}
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='COLON'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='struct_declarator'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-            self.graph.add_edge(edge)
-            p[0]["ref"] = "node_"+str(counter-1)
-        print "function-41: ", counter
+            nid = self._add_token_node('COLON', 'struct_declarator')
+            self._add_edge(nid, p[2].ref)
+            p[0]["ref"] = nid
 
     def p_enum_specifier_1(self, p):
         """ enum_specifier  : ENUM ID
                             | ENUM TYPEID
         """
-        global counter
         p[0] = c_ast.Enum(p[2], None, self._coord(p.lineno(1)))
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='ENUM'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='ID/TYPEID'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='enum_specifier'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0].ref = "node_"+str(counter-1)
-        print "QWERTY: ", p[2]
-        print "function-42: ", counter
+        enum, id_typeid = self._add_nodes(['ENUM', 'ID/TYPEID'])
+        p[0].ref = self._add_parent_node('enum_specifier', enum, id_typeid)
 
     def p_enum_specifier_2(self, p):
         """ enum_specifier  : ENUM brace_open enumerator_list brace_close
         """
         p[0] = c_ast.Enum(None, p[3], self._coord(p.lineno(1)))
-        global counter
-        tmp_node1 = p[2].split("@")
-        p[2] = tmp_node1[0]
-        tmp_node2 = p[4].split("@")
-        p[4] = tmp_node2[0]
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='ENUM'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='enum_specifier'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), tmp_node1[1]) 
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), tmp_node2[1]) 
-        self.graph.add_edge(edge)
-        p[0].ref = "node_" + str(counter-1)
-        print "function-43: ", counter
-        
+        nid = self._add_token_node('ENUM', 'enum_specifier')
+        self._add_edge(nid, p[2].ref)
+        self._add_edge(nid, p[3].ref)
+        self._add_edge(nid, p[4].ref)
+        p[0].ref = nid
 
     def p_enum_specifier_3(self, p):
         """ enum_specifier  : ENUM ID brace_open enumerator_list brace_close
                             | ENUM TYPEID brace_open enumerator_list brace_close
         """
         p[0] = c_ast.Enum(p[2], p[4], self._coord(p.lineno(1)))
-        global counter
-        tmp_node1 = p[3].split("@")
-        p[3] = tmp_node1[0]
-        tmp_node2 = p[5].split("@")
-        p[5] = tmp_node2[0]
-        
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='ENUM'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='ID / TYPEID'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='enum_specifier'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), tmp_node1[1]) 
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), tmp_node2[1]) 
-        self.graph.add_edge(edge)
-        p[0].ref = "node_" + str(counter-1)
-        print "function-44: ", counter
-                
+        enum, id_typeid = self._add_nodes(['ENUM', 'ID / TYPEID'])
+        p[0].ref = self._add_parent_node(
+            'enum_specifier', enum, id_typeid, p[3].ref, id_typeid, p[5].ref)
 
     def p_enumerator_list(self, p):
         """ enumerator_list : enumerator
                             | enumerator_list COMMA
                             | enumerator_list COMMA enumerator
         """
-        global counter
         if len(p) == 2:
             p[0] = c_ast.EnumeratorList([p[1]], p[1].coord)
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='enumerator_list'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge)
-            
+            nid = self._add_parent_node('enumerator_list', p[1].ref)
         elif len(p) == 3:
             p[0] = p[1]
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='COMMA'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='enumerator_list'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            
+            comma = self._add_node('COMMA')
+            nid = self._add_parent_node('enumerator_list', p[1].ref, comma)
         else:
             p[1].enumerators.append(p[3])
             p[0] = p[1]
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='COMMA'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='enumerator_list'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-            self.graph.add_edge(edge)
-        p[0].ref = "node_" + str(counter-1)
-        print "function-45: ", counter
-
-            
+            comma = self._add_node('COMMA')
+            nid = self._add_parent_node(
+                'enumerator_list', p[1].ref, comma, p[3].ref)
+        p[0].ref = nid
+
     def p_enumerator(self, p):
         """ enumerator  : ID
                         | ID EQUALS constant_expression
         """
-        global counter
         if len(p) == 2:
             enumerator = c_ast.Enumerator(
                         p[1], None,
                         self._coord(p.lineno(1)))
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='ID'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='enumerator'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
+            nid = self._add_token_node('ID', 'enumerator')
 
         else:
             enumerator = c_ast.Enumerator(
                         p[1], p[3],
                         self._coord(p.lineno(1)))
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='ID'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='EQUALS'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='enumerator'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-            self.graph.add_edge(edge)
+            id_, equals = self._add_nodes(['ID', 'EQUALS'])
+            nid = self._add_parent_node('enumerator', id_, equals, p[3].ref)
 
         self._add_identifier(enumerator.name, enumerator.coord)
 
         p[0] = enumerator
-        p[0].ref = 'node_' + str(counter-1)
-        print "function-46: ", counter
+        p[0].ref = nid
 
+    @_make_rule('declarator', 1)
     def p_declarator_1(self, p):
         """ declarator  : direct_declarator
         """
         p[0] = p[1]
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='declarator'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge)
-        p[0].ref = "node_" + str(counter-1)
-        print "function-47: ", counter
-        
+
+    @_make_rule('declarator', 1, 2)
     def p_declarator_2(self, p):
         """ declarator  : pointer direct_declarator
         """
         p[0] = self._type_modify_decl(p[2], p[1])
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='declarator'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        self.graph.add_edge(edge)
-        p[0].ref = "node_" + str(counter-1)
-        print "function-48: ", counter
-        
+
     # Since it's impossible for a type to be specified after a pointer, assume
     # it's intended to be the name for this declaration.  _add_identifier will
     # raise an error if this TYPEID can't be redeclared.
     #
+    @_make_rule('declarator', 1, 'TYPEID')
     def p_declarator_3(self, p):
         """ declarator  : pointer TYPEID
         """
@@ -1794,61 +1507,29 @@ class CParser(PLYParser):
             coord=self._coord(p.lineno(2)))
 
         p[0] = self._type_modify_decl(decl, p[1])
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='TYPEID'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='declarator'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0].ref = "node_" + str(counter-1)
-        print "function-49: ", counter
-        
+
+    @_make_rule('direct_declarator', 'ID')
     def p_direct_declarator_1(self, p):
         """ direct_declarator   : ID
         """
-        global counter
         p[0] = c_ast.TypeDecl(
             declname=p[1],
             type=None,
             quals=None,
             coord=self._coord(p.lineno(1)))
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='ID'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='direct_declarator'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0].ref = 'node_' + str(counter-1)
-        print "function-50: ", counter
 
+    @_make_rule('direct_declarator', 'LPAREN', 2, 'RPAREN')
     def p_direct_declarator_2(self, p):
         """ direct_declarator   : LPAREN declarator RPAREN
         """
         p[0] = p[2]
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='LPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='RPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='direct_declarator'))
-        counter = counter+1
-        
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0].ref = "node_" + str(counter-1)
-        print "function-51: ", counter
 
+    @_make_rule(
+        'direct_declarator', 1, 'LBRACKET', _Value(3), _Value(4), 'RBRACKET')
     def p_direct_declarator_3(self, p):
         """ direct_declarator   : direct_declarator LBRACKET type_qualifier_list_opt assignment_expression_opt RBRACKET
         """
-        quals = (p[3] if len(p) > 5 else []) or []
+        quals = p[3][:-1] if p[3] else []
         # Accept dimension qualifiers
         # Per C99 6.7.5.3 p7
         arr = c_ast.ArrayDecl(
@@ -1859,45 +1540,7 @@ class CParser(PLYParser):
             ref = 'tmp')
 
         p[0] = self._type_modify_decl(decl=p[1], modifier=arr)
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='LBRACKET'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='RBRACKET'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='direct_declarator'))
-        counter = counter+1
-
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge)
-        if isinstance(p[3], list):
-            length = len(p[3])
-            edge = pydot.Edge("node_"+str(counter-1), p[3][length-1])
-        elif isinstance(p[3], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[3]["ref"])
-        elif p[3] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge)
-        if isinstance(p[4], list):
-            length = len(p[4])
-            edge = pydot.Edge("node_"+str(counter-1), p[4][length-1])
-        elif isinstance(p[4], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[4]["ref"])
-        elif p[4] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[4].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0].ref = "node_" + str(counter-1)
-        print "function-52: ", counter
-   
-
-        
+
     def p_direct_declarator_4(self, p):
         """ direct_declarator   : direct_declarator LBRACKET STATIC type_qualifier_list_opt assignment_expression RBRACKET
                                 | direct_declarator LBRACKET type_qualifier_list STATIC assignment_expression RBRACKET
@@ -1905,7 +1548,7 @@ class CParser(PLYParser):
         # Using slice notation for PLY objects doesn't work in Python 3 for the
         # version of PLY embedded with pycparser; see PLY Google Code issue 30.
         # Work around that here by listing the two elements separately.
-        listed_quals = [item if isinstance(item, list) else [item]
+        listed_quals = [item[:-1] if isinstance(item, list) else [item]
             for item in [p[3],p[4]]]
         dim_quals = [qual for sublist in listed_quals for qual in sublist
             if qual is not None]
@@ -1916,106 +1559,33 @@ class CParser(PLYParser):
             coord=p[1].coord)
 
         p[0] = self._type_modify_decl(decl=p[1], modifier=arr)
-        global counter
+        lbracket, static, rbracket = self._add_nodes(
+            ['LBRACKET', 'STATIC', 'RBRACKET'])
         if isinstance(p[3], str):
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='LBRACKET'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='STATIC'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='RBRACKET'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='direct_declarator'))
-            counter = counter+1
-
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-4))
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-            self.graph.add_edge(edge)
-            if isinstance(p[4], list):
-                length = len(p[4])
-                edge = pydot.Edge("node_"+str(counter-1), p[4][length-1])
-            elif isinstance(p[4], dict):
-                edge = pydot.Edge("node_"+str(counter-1), p[4]["ref"])
-            elif p[4] is not None:
-                edge = pydot.Edge("node_"+str(counter-1), p[4].ref)
-            else:
-                edge = pydot.Edge("node_"+str(counter-1), "empty")
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), p[5].ref)
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
+            nid = self._add_parent_node(
+                'direct_declarator', p[1].ref, lbracket, static,
+                self._ref(p[4]), p[5].ref, rbracket)
         else:
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='LBRACKET'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='STATIC'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='RBRACKET'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='direct_declarator'))
-            counter = counter+1
-
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-4))
-            self.graph.add_edge(edge)
-            length = len(p[3])
-            edge = pydot.Edge("node_"+str(counter-1), p[3][length-1])
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), p[5].ref)
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-        p[0].ref = "node_" + str(counter-1)
-        print "function-53: ", counter
+            nid = self._add_parent_node(
+                'direct_declarator', p[1].ref, lbracket, p[3][-1], static,
+                p[5].ref, rbracket)
+        p[0].ref = nid
 
     # Special for VLAs
     #
+    @_make_rule(
+        'direct_declarator', 1, 'LBRACKET', _Value(3), 'TIMES', 'RBRACKET')
     def p_direct_declarator_5(self, p):
         """ direct_declarator   : direct_declarator LBRACKET type_qualifier_list_opt TIMES RBRACKET
         """
         arr = c_ast.ArrayDecl(
             type=None,
             dim=c_ast.ID(p[4], self._coord(p.lineno(4))),
-            dim_quals=p[3] if p[3] != None else [],
+            dim_quals=p[3][:-1] if p[3] != None else [],
             coord=p[1].coord)
-
-        global counter
         p[0] = self._type_modify_decl(decl=p[1], modifier=arr)
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='LBRACKET'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='TIMES'))
-        counter = counter+1    
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='RBRACKET'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='direct_declarator'))
-        counter = counter+1
-
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-4))
-        self.graph.add_edge(edge)
-        if isinstance(p[3], list):
-            length = len(p[3])
-            edge = pydot.Edge("node_"+str(counter-1), p[3][length-1])
-        elif isinstance(p[3], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[3]["ref"])
-        elif p[3] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0].ref = "node_"  + str(counter-1)
-        print "function-54: ", counter
-        
+
+    @_make_rule('direct_declarator', 1, 'LPAREN', _Value(3), 'RPAREN')
     def p_direct_declarator_6(self, p):
         """ direct_declarator   : direct_declarator LPAREN parameter_type_list RPAREN
                                 | direct_declarator LPAREN identifier_list_opt RPAREN
@@ -2024,7 +1594,6 @@ class CParser(PLYParser):
             args=p[3],
             type=None,
             coord=p[1].coord)
-        global counter 
 
         # To see why _get_yacc_lookahead_token is needed, consider:
         #   typedef char TT;
@@ -2044,32 +1613,6 @@ class CParser(PLYParser):
                     self._add_identifier(param.name, param.coord)
 
         p[0] = self._type_modify_decl(decl=p[1], modifier=func)
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='LPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='RPAREN'))
-        counter = counter+1    
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='direct_declarator'))
-        counter = counter+1
-        
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge)
-        if isinstance(p[3], list):
-            length = len(p[3])
-            edge = pydot.Edge("node_"+str(counter-1), p[3][length-1])
-        elif isinstance(p[3], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[3]["ref"])
-        elif p[3] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0].ref = "node_" + str(counter-1)
-        print "function-55: ", counter
-        
 
     def p_pointer(self, p):
         """ pointer : TIMES type_qualifier_list_opt
@@ -2091,85 +1634,36 @@ class CParser(PLYParser):
         #
         # So when we construct PtrDecl nestings, the leftmost pointer goes in
         # as the most nested type.
-        nested_type = c_ast.PtrDecl(quals=p[2] or [], type=None, coord=coord)
-        global counter
+        nested_type = c_ast.PtrDecl(
+            quals=p[2][:-1] if p[2] else [], type=None, coord=coord)
         if len(p) > 3:
             tail_type = p[3]
             while tail_type.type is not None:
                 tail_type = tail_type.type
             tail_type.type = nested_type
             p[0] = p[3]
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='TIMES'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='pointer'))
-            counter = counter+1
-
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            if isinstance(p[2], list):
-                length = len(p[2])
-                edge = pydot.Edge("node_"+str(counter-1), p[2][length-1])
-            elif isinstance(p[2], dict):
-                edge = pydot.Edge("node_"+str(counter-1), p[2]["ref"])
-            elif p[2] is not None:
-                edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-            else:
-                edge = pydot.Edge("node_"+str(counter-1), "empty")
-            self.graph.add_edge(edge)            
-            edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-            self.graph.add_edge(edge)
-            
+            times = self._add_node('TIMES')
+            nid = self._add_parent_node(
+                'pointer', times, self._ref(p[2]), p[3].ref)
         else:
             p[0] = nested_type
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='TIMES'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='pointer'))
-            counter = counter+1
-
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            if isinstance(p[2], list):
-                length = len(p[2])
-                edge = pydot.Edge("node_"+str(counter-1), p[2][length-1])
-            elif isinstance(p[2], dict):
-                edge = pydot.Edge("node_"+str(counter-1), p[2]["ref"])
-            elif p[2] is not None:
-                edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-            else:
-                edge = pydot.Edge("node_"+str(counter-1), "empty")
-            self.graph.add_edge(edge)            
+            times = self._add_node('TIMES')
+            nid = self._add_parent_node('pointer', times, self._ref(p[2]))
+        p[0].ref = nid
 
-        p[0].ref = "node_" + str(counter-1)
-        print "function-56: ", counter
-        
     def p_type_qualifier_list(self, p):
         """ type_qualifier_list : type_qualifier
                                 | type_qualifier_list type_qualifier
         """
-        global counter
         if len(p) == 2:
-            tmp_node = p[1].split("@")
-            p[1] = tmp_node[0]
-            p[0] = [p[1]]
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='type_qualifier_list'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), tmp_node[1])
-            self.graph.add_edge(edge)
-            p[0].append("node_"+str(counter-1))
+            p[0] = [p[1].value]
+            p[0].append(self._add_parent_node(
+                'type_qualifier_list', p[1].ref))
         else:
-            tmp_node = p[2].split("@")
-            p[2] = tmp_node[0]
             x = p[1].pop()
-            p[0] = p[1] + [p[2]]
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='type_qualifier_list'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), x)
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), tmp_node[1])
-            self.graph.add_edge(edge)
-            p[0].append("node_"+str(counter-1))
-        p[0] = [p[1]] if len(p) == 2 else p[1] + [p[2]]
-        print "function-57: ", counter
+            p[0] = p[1] + [p[2].value]
+            nid = self._add_parent_node('type_qualifier_list', x, p[2].ref)
+            p[0].append(nid)
 
     def p_parameter_type_list(self, p):
         """ parameter_type_list : parameter_list
@@ -2179,71 +1673,40 @@ class CParser(PLYParser):
             p[1].params.append(c_ast.EllipsisParam(self._coord(p.lineno(3))))
 
         p[0] = p[1]
-        global counter
         if len(p) == 2:
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='parameter_type_list'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge)
-            p[0].ref = "node_"+str(counter-1)
+            p[0].ref = self._add_parent_node('parameter_type_list', p[1].ref)
         else:
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='COMMA'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='ELLIPSIS'))
-            counter = counter+1  
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='parameter_type_list'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            p[0].ref = "node_"+str(counter-1)
-        print "function-58: ", counter
+            comma, ellipsis = self._add_nodes(['COMMA', 'ELLIPSIS'])
+            p[0].ref = self._add_parent_node(
+                'parameter_type_list', p[1].ref, comma, ellipsis)
 
 
     def p_parameter_list(self, p):
         """ parameter_list  : parameter_declaration
                             | parameter_list COMMA parameter_declaration
         """
-        global counter
         if len(p) == 2: # single parameter
             p[0] = c_ast.ParamList([p[1]], p[1].coord)
             tmp_node = ''
             if isinstance(p[1], list):
-                length = len(p[1])
-                tmp_node = p[1][length-1]
+                tmp_node = p[1][-1]
             else:
                 tmp_node = p[1].ref
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='parameter_list'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), tmp_node)
-            self.graph.add_edge(edge)
-            p[0].ref = "node_"+str(counter-1)
+            p[0].ref = self._add_parent_node('parameter_list', tmp_node)
 
         else:
             p[1].params.append(p[3])
             p[0] = p[1]
             tmp_node = ''
             if isinstance(p[3], list):
-                length = len(p[3])
-                tmp_node = p[3][length-1]
+                tmp_node = p[3][-1]
             else:
                 tmp_node = p[1].ref
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='COMMA'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='parameter_list'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            edge = pydot.Edge("node_"+str(counter-1), tmp_node)
-            self.graph.add_edge(edge)
-            p[0].ref = "node_"+str(counter-1)
-        print "function-59: ", counter
+            comma = self._add_node('COMMA')
+            p[0].ref = self._add_parent_node(
+                'parameter_list', p[1].ref, comma, tmp_node)
 
+    @_make_rule('parameter_declaration', _Value(1), 2)
     def p_parameter_declaration_1(self, p):
         """ parameter_declaration   : declaration_specifiers declarator
         """
@@ -2251,22 +1714,9 @@ class CParser(PLYParser):
         if not spec['type']:
             spec['type'] = [c_ast.IdentifierType(['int'],
                 coord=self._coord(p.lineno(1)))]
-        print p[2], type(p[2])
-        print "spec is: ", spec
-        a = self._build_declarations(
+        p[0] = self._build_declarations(
             spec=spec,
-            decls=[dict(decl=p[2])])
-        print a
-        p[0] = a[0]
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='parameter_declaration'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1]["ref"])
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        self.graph.add_edge(edge) 
-        p[0].ref = "node_"+str(counter-1)
-        print "function-60: ", counter
+            decls=[dict(decl=p[2])])[0]
 
     def p_parameter_declaration_2(self, p):
         """ parameter_declaration   : declaration_specifiers abstract_declarator_opt
@@ -2280,29 +1730,15 @@ class CParser(PLYParser):
         # the parameter's name gets grouped into declaration_specifiers, making
         # it look like an old-style declaration; compensate.
         #
-        global counter
         if len(spec['type']) > 1 and len(spec['type'][-1].names) == 1 and \
                 self._is_type_in_scope(spec['type'][-1].names[0]):
             decl = self._build_declarations(
                     spec=spec,
                     decls=[dict(decl=p[2], init=None)])[0]
             p[0] = decl
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='parameter_declaration'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1]["ref"])
-            self.graph.add_edge(edge)
-            if isinstance(p[2], list):
-                length = len(p[2])
-                edge = pydot.Edge("node_"+str(counter-1), p[2][length-1])
-            elif isinstance(p[2], dict):
-                edge = pydot.Edge("node_"+str(counter-1), p[2]["ref"])
-            elif p[2] is not None:
-                edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-            else:
-                edge = pydot.Edge("node_"+str(counter-1), "empty")
-            self.graph.add_edge(edge) 
-            p[0].append("node_"+str(counter-1))
-
+            nid = self._add_parent_node(
+                'parameter_declaration', p[1]["ref"], self._ref(p[2]))
+            p[0].append(nid)
 
         # This truly is an old-style parameter declaration
         #
@@ -2315,65 +1751,27 @@ class CParser(PLYParser):
             typename = spec['type']
             decl = self._fix_decl_name_type(decl, typename)
             p[0] = decl
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='parameter_declaration'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1]["ref"])
-            self.graph.add_edge(edge)
-            if isinstance(p[2], list):
-                length = len(p[2])
-                edge = pydot.Edge("node_"+str(counter-1), p[2][length-1])
-            elif isinstance(p[2], dict):
-                edge = pydot.Edge("node_"+str(counter-1), p[2]["ref"])
-            elif p[2] is not None:
-                edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-            else:
-                edge = pydot.Edge("node_"+str(counter-1), "empty")
-            self.graph.add_edge(edge) 
-            p[0].ref = "node_"+str(counter-1)
-        print "function-61: ", counter
-
-        
+            p[0].ref = self._add_parent_node(
+                'parameter_declaration', p[1]["ref"], self._ref(p[2]))
 
     def p_identifier_list(self, p):
         """ identifier_list : identifier
                             | identifier_list COMMA identifier
         """
-        global counter
         if len(p) == 2: # single parameter
             p[0] = c_ast.ParamList([p[1]], p[1].coord)
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='identifier_list'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge) 
-            p[0].ref = "node_"+str(counter-1)
+            p[0].ref = self._add_parent_node('identifier_list', p[1].ref)
         else:
             p[1].params.append(p[3])
             p[0] = p[1]
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='identifier_list'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='COMMA'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge) 
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-            self.graph.add_edge(edge) 
-            p[0].ref = "node_"+str(counter-1)
-        print "function-62: ", counter
+            nid = self._add_node('identifier_list')
+            p[0].ref = self._add_parent_node('COMMA', p[1].ref, nid, p[3].ref)
 
+    @_make_rule('initializer', 1)
     def p_initializer_1(self, p):
         """ initializer : assignment_expression
         """
         p[0] = p[1]
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='initializer'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge) 
-        p[0].ref = "node_"+str(counter-1)           
-        # print p[0]
-        print "function-63: ", counter
 
     def p_initializer_2(self, p):
         """ initializer : brace_open initializer_list_opt brace_close
@@ -2383,115 +1781,40 @@ class CParser(PLYParser):
             p[0] = c_ast.InitList([], self._coord(p.lineno(1)))
         else:
             p[0] = p[2]
-
-        global counter
         if len(p) == 4:
-            tmp_node1 = p[1].split("@")
-            p[1] = tmp_node1[0]
-            tmp_node2 = p[3].split("@")
-            p[3] = tmp_node2[0]
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='initializer'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), tmp_node1[1])
-            self.graph.add_edge(edge)            
-            if isinstance(p[2], list):
-                length = len(p[2])
-                edge = pydot.Edge("node_"+str(counter-1), p[2][length-1])
-            elif isinstance(p[2], dict):
-                edge = pydot.Edge("node_"+str(counter-1), p[2]["ref"])
-            elif p[2] is not None:
-                edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-            else:
-                edge = pydot.Edge("node_"+str(counter-1), "empty")
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), tmp_node2[1])
-            self.graph.add_edge(edge)
-            p[0].ref = "node_"+str(counter-1)
+            p[0].ref = self._add_parent_node(
+                'initializer', p[1].ref, self._ref(p[2]), p[3].ref)
         else:
-            tmp_node1 = p[1].split("@")
-            p[1] = tmp_node1[0]
-            tmp_node2 = p[4].split("@")
-            p[4] = tmp_node2[0]
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='COMMA'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='initializer'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), tmp_node1[1])
-            self.graph.add_edge(edge) 
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-            self.graph.add_edge(edge)            
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), tmp_node2[1])
-            self.graph.add_edge(edge)
-            p[0].ref = "node_"+str(counter-1)
-        print "function-64: ", counter
+            comma = self._add_node('COMMA')
+            p[0].ref = self._add_parent_node(
+                'initializer', p[1].ref, p[2].ref, comma, p[4].ref)
 
     def p_initializer_list(self, p):
         """ initializer_list    : designation_opt initializer
                                 | initializer_list COMMA designation_opt initializer
         """
-        global counter
         if len(p) == 3: # single initializer
-            init = p[2] if p[1] is None else c_ast.NamedInitializer(p[1], p[2])
+            init = p[2] if p[1] is None else c_ast.NamedInitializer(
+                p[1][:-1], p[2])
             p[0] = c_ast.InitList([init], p[2].coord)
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='initializer_list'))
-            counter = counter+1
-
-            if isinstance(p[1], list):
-                length = len(p[1])
-                edge = pydot.Edge("node_"+str(counter-1), p[1][length-1])
-            elif isinstance(p[1], dict):
-                edge = pydot.Edge("node_"+str(counter-1), p[1]["ref"])
-            elif p[1] is not None:
-                edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            else:
-                edge = pydot.Edge("node_"+str(counter-1), "empty")
-            self.graph.add_edge(edge)            
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-            self.graph.add_edge(edge)
-            p[0].ref = "node_"+str(counter-1)
+            p[0].ref = self._add_parent_node(
+                'initializer_list', self._ref(p[1]), p[2].ref)
         else:
-            init = p[4] if p[3] is None else c_ast.NamedInitializer(p[3], p[4])
+            init = p[4] if p[3] is None else c_ast.NamedInitializer(
+                p[3][:-1], p[4])
             p[1].exprs.append(init)
             p[0] = p[1]
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='COMMA'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='initializer_list'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge)            
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)            
-            if isinstance(p[3], list):
-                length = len(p[3])
-                edge = pydot.Edge("node_"+str(counter-1), p[3][length-1])
-            elif isinstance(p[3], dict):
-                edge = pydot.Edge("node_"+str(counter-1), p[3]["ref"])
-            elif p[3] is not None:
-                edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-            else:
-                edge = pydot.Edge("node_"+str(counter-1), "empty")
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), p[4].ref)
-            self.graph.add_edge(edge) 
-            p[0].ref = "node_"+str(counter-1)
-        print "function-65: ", counter
+            comma = self._add_node('COMMA')
+            p[0].ref = self._add_parent_node(
+                'initializer_list', p[1].ref, comma, self._ref(p[3]), p[4].ref)
 
 
     def p_designation(self, p):
         """ designation : designator_list EQUALS
         """
         p[0] = p[1]
-        global counter 
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='EQUALS'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1][length-1])
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0][length-1] = "node_"+str(counter-1)   
-        print "function-66: ", counter                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                              
+        equals = self._add_node('EQUALS')
+        p[0][-1] = self._add_parent_node('designation', p[1][-1], equals)
 
     # Designators are represented as a list of nodes, in the order in which
     # they're written in the code.
@@ -2500,56 +1823,30 @@ class CParser(PLYParser):
         """ designator_list : designator
                             | designator_list designator
         """
-        p[0] = [p[1]] if len(p) == 2 else p[1] + [p[2]]
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='designator_list'))
-        counter = counter+1
-        if len(p) == 3:
-            length = len(p[1])
-            edge = pydot.Edge("node_"+str(counter-1), p[1][length-1])
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-            self.graph.add_edge(edge)   
-            p[0][length-1] = 'node_' + str(counter-1)
+        if len(p) == 2:
+            nid = self._add_parent_node('designator_list', p[1].ref)
+            p[0] = [p[1], nid]
         else:
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge)            
-            p[0].append('node_' + str(counter-1))
-        print "function-67: ", counter
+            nid = self._add_parent_node(
+                'designator_list', p[1][-1], p[2].ref)
+            p[0] = p[1][:-1] + [p[2], nid]
 
     def p_designator(self, p):
         """ designator  : LBRACKET constant_expression RBRACKET
                         | PERIOD identifier
         """
         p[0] = p[2]
-        global counter
         if len(p) == 4:
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='LBRACKET'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='RBRACKET'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='designator'))
-            counter = counter+1
-
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-            self.graph.add_edge(edge)            
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
+            lbracket, rbracket = self._add_nodes(['LBRACKET', 'RBRACKET'])
+            nid = self._add_parent_node(
+                'designator', lbracket, p[2].ref, rbracket)
         else:
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='LBRACKET'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='designator'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-            self.graph.add_edge(edge)
-        p[0].ref = 'node_' + str(counter-1)  
-        print "function-68: ", counter      
+            nid = self._add_token_node('LBRACKET', 'designator')
+            self._add_edge(nid, p[2].ref)
+        p[0].ref = nid
 
 
+    @_make_rule('type_name', _Value(1), _Value(2))
     def p_type_name(self, p):
         """ type_name   : specifier_qualifier_list abstract_declarator_opt
         """
@@ -2560,26 +1857,10 @@ class CParser(PLYParser):
             coord=self._coord(p.lineno(2)))
 
         p[0] = self._fix_decl_name_type(typename, p[1]['type'])
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='type_name'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1]["ref"])
-        self.graph.add_edge(edge)
-        if isinstance(p[2], list):
-            length = len(p[2])
-            edge = pydot.Edge("node_"+str(counter-1), p[2][length-1])
-        elif isinstance(p[2], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[2]["ref"])
-        elif p[2] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge)
-        p[0].ref = "node_"+str(counter-1);
         # dictionary problems - specifier_qualifier_list is a dict
-        print "function-69: ", counter
 
 
+    @_make_rule('abstract_declarator', 1)
     def p_abstract_declarator_1(self, p):
         """ abstract_declarator     : pointer
         """
@@ -2587,68 +1868,31 @@ class CParser(PLYParser):
         p[0] = self._type_modify_decl(
             decl=dummytype,
             modifier=p[1])
-        print "qqqqqqqqqqqqqqqqqqqqqqqq", type(p[0])
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='abstract_declarator'))
-        counter = counter+1
-
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge)
-        p[0].ref = 'node_' + str(counter-1)
-        print "function-70: ", counter
 
+    @_make_rule('abstract_declarator', 1, 2)
     def p_abstract_declarator_2(self, p):
         """ abstract_declarator     : pointer direct_abstract_declarator
         """
         p[0] = self._type_modify_decl(p[2], p[1])
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='abstract_declarator'))
-        counter = counter+1
-
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        self.graph.add_edge(edge)
-        p[0].ref = 'node_' + str(counter-1)
-        print "function-71: ", counter
 
+    @_make_rule('abstract_declarator', 1)
     def p_abstract_declarator_3(self, p):
         """ abstract_declarator     : direct_abstract_declarator
         """
         p[0] = p[1]
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='abstract_declarator'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge)
-        p[0].ref = 'node_' + str(counter-1)
-        print "function-72: ", counter
 
     # Creating and using direct_abstract_declarator_opt here
     # instead of listing both direct_abstract_declarator and the
     # lack of it in the beginning of _1 and _2 caused two
     # shift/reduce errors.
     #
+    @_make_rule('direct_abstract_declarator', 'LPAREN', 2, 'RPAREN')
     def p_direct_abstract_declarator_1(self, p):
         """ direct_abstract_declarator  : LPAREN abstract_declarator RPAREN """
         p[0] = p[2]
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='LPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='RPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='direct_abstract_declarator'))
-        counter = counter+1
-
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0].ref = 'node_' + str(counter-1)
-        print "function-73: ", counter
 
+    @_make_rule(
+        'direct_abstract_declarator', 1, 'LBRACKET', _Value(3), 'RBRACKET')
     def p_direct_abstract_declarator_2(self, p):
         """ direct_abstract_declarator  : direct_abstract_declarator LBRACKET assignment_expression_opt RBRACKET
         """
@@ -2659,34 +1903,10 @@ class CParser(PLYParser):
             coord=p[1].coord)
 
         p[0] = self._type_modify_decl(decl=p[1], modifier=arr)
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='LBRACKET'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='RBRACKET'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='direct_abstract_declarator'))
-        counter = counter+1
-
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge)
-        if isinstance(p[3], list):
-            length = len(p[3])
-            edge = pydot.Edge("node_"+str(counter-1), p[3][length-1])
-        elif isinstance(p[3], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[3]["ref"])
-        elif p[3] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0].ref = 'node_' + str(counter-1)
-        print "function-74: ", counter
 
 
+    @_make_rule(
+        'direct_abstract_declarator', 'LBRACKET', _Value(2), 'RBRACKET')
     def p_direct_abstract_declarator_3(self, p):
         """ direct_abstract_declarator  : LBRACKET assignment_expression_opt RBRACKET
         """
@@ -2695,32 +1915,10 @@ class CParser(PLYParser):
             dim=p[2],
             dim_quals=[],
             coord=self._coord(p.lineno(1)))
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='LBRACKET'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='RBRACKET'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='direct_abstract_declarator'))
-        counter = counter+1
-
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge)
-        if isinstance(p[2], list):
-            length = len(p[2])
-            edge = pydot.Edge("node_"+str(counter-1), p[2][length-1])
-        elif isinstance(p[2], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[2]["ref"])
-        elif p[2] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0].ref = 'node_' + str(counter-1)
-        print "function-75: ", counter
 
 
+    @_make_rule(
+        'direct_abstract_declarator', 1, 'LBRACKET', 'TIMES', 'RBRACKET')
     def p_direct_abstract_declarator_4(self, p):
         """ direct_abstract_declarator  : direct_abstract_declarator LBRACKET TIMES RBRACKET
         """
@@ -2732,54 +1930,18 @@ class CParser(PLYParser):
 
         p[0] = self._type_modify_decl(decl=p[1], modifier=arr)
 
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='LBRACKET'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='TIMES'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='RBRACKET'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='direct_abstract_declarator'))
-        counter = counter+1
-
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-4))
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0].ref = 'node_' + str(counter-1)
-        print "function-76: ", counter
-
 
+    @_make_rule('direct_abstract_declarator', 'LBRACKET', 'TIMES', 'RBRACKET')
     def p_direct_abstract_declarator_5(self, p):
         """ direct_abstract_declarator  : LBRACKET TIMES RBRACKET
         """
-        global counter
         p[0] = c_ast.ArrayDecl(
             type=c_ast.TypeDecl(None, None, None),
             dim=c_ast.ID(p[3], self._coord(p.lineno(3))),
             dim_quals=[],
             coord=self._coord(p.lineno(1)))
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='LBRACKET'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='TIMES'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='RBRACKET'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='direct_abstract_declarator'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-4))
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0].ref = 'node_' + str(counter-1)
-        print "function-77: ", counter
 
+    @_make_rule('direct_abstract_declarator', 1, 'LPAREN', _Value(3), 'RPAREN')
     def p_direct_abstract_declarator_6(self, p):
         """ direct_abstract_declarator  : direct_abstract_declarator LPAREN parameter_type_list_opt RPAREN
         """
@@ -2789,34 +1951,8 @@ class CParser(PLYParser):
             coord=p[1].coord)
 
         p[0] = self._type_modify_decl(decl=p[1], modifier=func)
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='LPAREN'))
-        counter = counter+1 
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='RPAREN'))
-        counter = counter+1 
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='direct_abstract_declarator'))
-        counter = counter+1 
-
-
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge)
-        if isinstance(p[3], list):
-            length = len(p[3])
-            edge = pydot.Edge("node_"+str(counter-1), p[3][length-1])
-        elif isinstance(p[3], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[3]["ref"])
-        elif p[3] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0].ref = "node_" + str(counter-1)
-        print "function-78: ", counter
 
+    @_make_rule('direct_abstract_declarator', 'LPAREN', _Value(2), 'RPAREN')
     def p_direct_abstract_declarator_7(self, p):
         """ direct_abstract_declarator  : LPAREN parameter_type_list_opt RPAREN
         """
@@ -2824,30 +1960,6 @@ class CParser(PLYParser):
             args=p[2],
             type=c_ast.TypeDecl(None, None, None),
             coord=self._coord(p.lineno(1)))
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='LPAREN'))
-        counter = counter+1 
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='RPAREN'))
-        counter = counter+1 
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='direct_abstract_declarator'))
-        counter = counter+1 
-
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge)
-        if isinstance(p[2], list):
-            length = len(p[2])
-            edge = pydot.Edge("node_"+str(counter-1), p[2][length-1])
-        elif isinstance(p[2], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[2]["ref"])
-        elif p[2] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0].ref = "node_" + str(counter-1)
-        print "function-79: ", counter
 
 
     # declaration is a list, statement isn't. To make it consistent, block_item
@@ -2857,22 +1969,12 @@ class CParser(PLYParser):
         """ block_item  : declaration
                         | statement
         """
-        p[0] = p[1] if isinstance(p[1], list) else [p[1]]
-        global counter
+        item = self._add_parent_node('block_item', self._ref(p[1]))
         if isinstance(p[1], list):
-            length = len(p[1])
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='block_item'))
-            counter = counter+1 
-            edge = pydot.Edge("node_"+str(counter-1), p[1][length-1])
-            self.graph.add_edge(edge)
-            p[0][length-1] = "node_"+str(counter-1)
+            p[0] = p[1]
+            p[0][-1] = item
         else:
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='block_item'))
-            counter = counter+1 
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge)
-            p[0].append("node_"+str(counter-1))
-        print "function-80: ", counter
+            p[0] = [p[1], item]
 
     # Since we made block_item a list, this just combines lists
     #
@@ -2881,29 +1983,17 @@ class CParser(PLYParser):
                             | block_item_list block_item
         """
         # Empty block items (plain ';') produce [None], so ignore them
-        global counter
         if len(p) == 2 or p[2] == [None]:
             p[0] = p[1]
-            length = len(p[1])
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='block_item_list'))
-            counter = counter+1 
-            edge = pydot.Edge("node_"+str(counter-1), p[1][length-1])
-            self.graph.add_edge(edge)
-            p[0][length-1] = "node_"+str(counter-1)
+            p[0][-1] = self._add_parent_node('block_item_list', p[1][-1])
         else:
-            length1 = len(p[1])
-            length2 = len(p[2])
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='block_item_list'))
-            counter = counter+1 
-            edge = pydot.Edge("node_"+str(counter-1), p[1][length1-1])
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), p[2][length2-1])
-            self.graph.add_edge(edge)
-            x = p[1].pop()
-            p[0] = p[1] + p[2]
-            length = len(p[0])
-            p[0][length-1] = "node_"+str(counter-1)
-        print "function-81: ", counter
+            nid = self._add_parent_node('block_item_list', p[1][-1], p[2][-1])
+            # Splice p[2] over the ref that ends p[1], so the list is
+            # extended in place and its last element becomes our ref
+            del p[1][-1]
+            p[1].extend(p[2])
+            p[1][-1] = nid
+            p[0] = p[1]
 
 
     def p_compound_statement_1(self, p):
@@ -2911,540 +2001,173 @@ class CParser(PLYParser):
         p[0] = c_ast.Compound(
             block_items=p[2],
             coord=self._coord(p.lineno(1)))
-        tmp_node1 = p[1].split("@")
-        p[1] = tmp_node1[0]
-        tmp_node2 = p[3].split("@")
-        p[3] = tmp_node2[0]
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='compound_statement'))
-        counter = counter+1 
-        edge = pydot.Edge("node_"+str(counter-1), tmp_node1[1])
-        self.graph.add_edge(edge) 
-        if isinstance(p[2], list):
-            length = len(p[2])
-            edge = pydot.Edge("node_"+str(counter-1), p[2][length-1])
-        elif isinstance(p[2], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[2]["ref"])
-        elif p[2] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), tmp_node2[1])
-        self.graph.add_edge(edge) 
-        p[0].ref = "node_"+str(counter-1)
-        print "function-82: ", counter
+        p[0].ref = self._add_parent_node(
+            'compound_statement', p[1].ref, self._ref(p[2]), p[3].ref)
 
+    @_make_rule('labeled_statement', 'ID', 'COLON', 3)
     def p_labeled_statement_1(self, p):
         """ labeled_statement : ID COLON statement """
         p[0] = c_ast.Label(p[1], p[3], self._coord(p.lineno(1)))
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='ID'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='COLON'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='labeled_statement'))
-        counter = counter+1 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-        self.graph.add_edge(edge) 
-        p[0].ref = "node_"+str(counter-1)
-        print "function-83: ", counter
 
+    @_make_rule('labeled_statement', 'CASE', 2, 'COLON', 4)
     def p_labeled_statement_2(self, p):
         """ labeled_statement : CASE constant_expression COLON statement """
         p[0] = c_ast.Case(p[2], [p[4]], self._coord(p.lineno(1)))
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='CASE'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='COLON'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='labeled_statement'))
-        counter = counter+1 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), p[4].ref)
-        self.graph.add_edge(edge) 
-        p[0].ref = "node_"+str(counter-1)
-        print "function-84: ", counter
 
+    @_make_rule('labeled_statement', 'DEFAULT', 'COLON', 3)
     def p_labeled_statement_3(self, p):
         """ labeled_statement : DEFAULT COLON statement """
         p[0] = c_ast.Default([p[3]], self._coord(p.lineno(1)))
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='DEFAULT'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='COLON'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='labeled_statement'))
-        counter = counter+1 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-        self.graph.add_edge(edge) 
-        p[0].ref = "node_"+str(counter-1)
-        print "function-85: ", counter
 
+    @_make_rule('selection_statement', 'IF', 'LPAREN', 3, 'RPAREN', 5)
     def p_selection_statement_1(self, p):
         """ selection_statement : IF LPAREN expression RPAREN statement """
         p[0] = c_ast.If(p[3], p[5], None, self._coord(p.lineno(1)))
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='IF'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='LPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='RPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='selection_statement'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-4))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), p[5].ref)
-        self.graph.add_edge(edge) 
-        p[0].ref = "node_"+str(counter-1)
-        print "function-86: ", counter
 
+    @_make_rule(
+        'selection_statement', 'IF', 'LPAREN', 3, 'RPAREN', 5, 'ELSE', 7)
     def p_selection_statement_2(self, p):
         """ selection_statement : IF LPAREN expression RPAREN statement ELSE statement """
         p[0] = c_ast.If(p[3], p[5], p[7], self._coord(p.lineno(1)))
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='IF'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='LPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='RPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='ELSE'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='selection_statement'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-5))
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-4))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), p[5].ref)
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), p[7].ref)
-        self.graph.add_edge(edge) 
-        p[0].ref = "node_"+str(counter-1)
-        print "function-87: ", counter
 
+    @_make_rule('selection_statement', 'SWITCH', 'LPAREN', 3, 'RPAREN', 5)
     def p_selection_statement_3(self, p):
         """ selection_statement : SWITCH LPAREN expression RPAREN statement """
         p[0] = fix_switch_cases(
                 c_ast.Switch(p[3], p[5], self._coord(p.lineno(1))))
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='SWITCH'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='LPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='RPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='selection_statement'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-4))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), p[5].ref)
-        self.graph.add_edge(edge) 
-        p[0].ref = "node_"+str(counter-1)
-        print "function-88: ", counter
 
+    @_make_rule('iteration_statement', 'WHILE', 'LPAREN', 3, 'RPAREN', 5)
     def p_iteration_statement_1(self, p):
         """ iteration_statement : WHILE LPAREN expression RPAREN statement """
         p[0] = c_ast.While(p[3], p[5], self._coord(p.lineno(1)))
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='WHILE'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='LPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='RPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='iteration_statement'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-4))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), p[5].ref)
-        self.graph.add_edge(edge) 
-        p[0].ref = "node_"+str(counter-1)
-        print "function-89: ", counter
 
+    @_make_rule(
+        'iteration_statement', 'DO', 2, 'WHILE', 'LPAREN', 5, 'RPAREN', 'SEMI')
     def p_iteration_statement_2(self, p):
         """ iteration_statement : DO statement WHILE LPAREN expression RPAREN SEMI """
         p[0] = c_ast.DoWhile(p[5], p[2], self._coord(p.lineno(1)))
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='DO'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='WHILE'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='LPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='RPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='SEMI'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='iteration_statement'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-6))
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-5))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-4))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), p[5].ref)
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge) 
-        p[0].ref = "node_"+str(counter-1)
-        print "function-90: ", counter
 
     def p_iteration_statement_3(self, p):
         """ iteration_statement : FOR LPAREN expression_opt SEMI expression_opt SEMI expression_opt RPAREN statement """
         p[0] = c_ast.For(p[3], p[5], p[7], p[9], self._coord(p.lineno(1)))
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='FOR'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='LPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='SEMI'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='SEMI'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='RPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='iteration_statement'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-6))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-5))
-        self.graph.add_edge(edge)
-        if isinstance(p[3], list):
-            length = len(p[3])
-            edge = pydot.Edge("node_"+str(counter-1), p[3][length-1])
-        elif isinstance(p[3], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[3]["ref"])
-        elif p[3] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-4))
-        self.graph.add_edge(edge) 
-        if isinstance(p[5], list):
-            length = len(p[5])
-            edge = pydot.Edge("node_"+str(counter-1), p[5][length-1])
-        elif isinstance(p[5], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[5]["ref"])
-        elif p[5] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[5].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge) 
-        if isinstance(p[7], list):
-            length = len(p[7])
-            edge = pydot.Edge("node_"+str(counter-1), p[7][length-1])
-        elif isinstance(p[7], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[7]["ref"])
-        elif p[7] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[7].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), p[9].ref)
-        self.graph.add_edge(edge) 
-        p[0].ref = "node_"+str(counter-1)
-        print "function-91: ", counter
+        for_, lparen, semi1, semi2, rparen, stmt = self._add_nodes(
+            ['FOR', 'LPAREN', 'SEMI', 'SEMI', 'RPAREN', 'iteration_statement'])
+        ref = self._ref
+        self._add_edges([
+            (stmt, for_), (stmt, lparen), (stmt, ref(p[3])), (stmt, semi1),
+            (stmt, ref(p[5])), (stmt, semi2), (stmt, ref(p[7])),
+            (stmt, rparen), (stmt, p[9].ref)])
+        p[0].ref = stmt
 
     def p_iteration_statement_4(self, p):
         """ iteration_statement : FOR LPAREN declaration expression_opt SEMI expression_opt RPAREN statement """
         p[0] = c_ast.For(c_ast.DeclList(p[3], self._coord(p.lineno(1))),
                          p[4], p[6], p[8], self._coord(p.lineno(1)))
-        length = len(p[3])
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='FOR'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='LPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='SEMI'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='RPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='iteration_statement'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-5))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-4))
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), p[3][length-1])
-        self.graph.add_edge(edge) 
-        if isinstance(p[4], list):
-            length = len(p[4])
-            edge = pydot.Edge("node_"+str(counter-1), p[4][length-1])
-        elif isinstance(p[4], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[4]["ref"])
-        elif p[4] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[4].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge) 
-        if isinstance(p[6], list):
-            length = len(p[6])
-            edge = pydot.Edge("node_"+str(counter-1), p[6][length-1])
-        elif isinstance(p[6], dict):
-            edge = pydot.Edge("node_"+str(counter-1), p[6]["ref"])
-        elif p[6] is not None:
-            edge = pydot.Edge("node_"+str(counter-1), p[6].ref)
-        else:
-            edge = pydot.Edge("node_"+str(counter-1), "empty")
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), p[8].ref)
-        self.graph.add_edge(edge) 
-        p[0].ref = "node_"+str(counter-1)
-        print "function-92: ", counter
-
+        for_, lparen, semi, rparen, stmt = self._add_nodes(
+            ['FOR', 'LPAREN', 'SEMI', 'RPAREN', 'iteration_statement'])
+        ref = self._ref
+        self._add_edges([
+            (stmt, for_), (stmt, lparen), (stmt, p[3][-1]), (stmt, ref(p[4])),
+            (stmt, semi), (stmt, ref(p[6])), (stmt, rparen), (stmt, p[8].ref)])
+        p[0].ref = stmt
+
+    @_make_rule('jump_statement', 'GOTO', 'ID', 'SEMI')
     def p_jump_statement_1(self, p):
         """ jump_statement  : GOTO ID SEMI """
         p[0] = c_ast.Goto(p[2], self._coord(p.lineno(1)))
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='GOTO'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='ID'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='SEMI'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='jump_statement'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-4))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge) 
-        p[0].ref = "node_"+str(counter-1)
-        print "function-93: ", counter
 
+    @_make_rule('jump_statement', 'BREAK', 'SEMI')
     def p_jump_statement_2(self, p):
         """ jump_statement  : BREAK SEMI """
         p[0] = c_ast.Break(self._coord(p.lineno(1)))
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='BREAK'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='SEMI'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='jump_statement'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge) 
-        p[0].ref = "node_"+str(counter-1)
-        print "function-94: ", counter
 
+    @_make_rule('jump_statement', 'CONTINUE', 'SEMI')
     def p_jump_statement_3(self, p):
         """ jump_statement  : CONTINUE SEMI """
         p[0] = c_ast.Continue(self._coord(p.lineno(1)))
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='CONTINUE'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='SEMI'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='jump_statement'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge) 
-        p[0].ref = "node_"+str(counter-1)
-        print "function-95: ", counter
 
     def p_jump_statement_4(self, p):
         """ jump_statement  : RETURN expression SEMI
                             | RETURN SEMI
         """
         p[0] = c_ast.Return(p[2] if len(p) == 4 else None, self._coord(p.lineno(1)))
-        global counter
-        if len(p) == 3:
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='RETURN'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='SEMI'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='jump_statement'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-            self.graph.add_edge(edge) 
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            p[0].ref = "node_"+str(counter-1)
-        else:
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='RETURN'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='SEMI'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='jump_statement'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-            self.graph.add_edge(edge) 
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            p[0].ref = "node_"+str(counter-1)
-        print "function-96: ", counter
+        ret, semi, stmt = self._add_nodes(['RETURN', 'SEMI', 'jump_statement'])
+        edges = [(stmt, ret)]
+        if len(p) == 4:
+            edges.append((stmt, p[2].ref))
+        edges.append((stmt, semi))
+        self._add_edges(edges)
+        p[0].ref = stmt
 
     def p_expression_statement(self, p):
         """ expression_statement : expression_opt SEMI """
-        global counter
         if p[1] is None:
             p[0] = c_ast.EmptyStatement(self._coord(p.lineno(2)))
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='SEMI'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='expression_statement'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            p[0].ref = "node_"+str(counter-1)
+            nid = self._add_token_node('SEMI', 'expression_statement')
+            p[0].ref = nid
         else:
             p[0] = p[1]
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='SEMI'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='expression_statement'))
-            counter = counter+1
-            if isinstance(p[1], list):
-                length = len(p[1])
-                edge = pydot.Edge("node_"+str(counter-1), p[1][length-1])
-            elif isinstance(p[1], dict):
-                edge = pydot.Edge("node_"+str(counter-1), p[1]["ref"])
-            elif p[1] is not None:
-                edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            else:
-                edge = pydot.Edge("node_"+str(counter-1), "empty")
-            self.graph.add_edge(edge) 
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            p[0].ref = "node_"+str(counter-1)
-        print "function-97: ", counter
+            semi = self._add_node('SEMI')
+            p[0].ref = self._add_parent_node(
+                'expression_statement', self._ref(p[1]), semi)
 
     def p_expression(self, p):
         """ expression  : assignment_expression
                         | expression COMMA assignment_expression
         """
-        global counter
         if len(p) == 2:
             p[0] = p[1]
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='expression'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge) 
-            p[0].ref = "node_"+str(counter-1)
+            expr = self._add_parent_node('expression', p[1].ref)
         else:
+            # Grab the graph node before a bare expression gets wrapped
+            # into a fresh ExprList, which has no ref of its own yet
+            lhs = p[1].ref
             if not isinstance(p[1], c_ast.ExprList):
                 p[1] = c_ast.ExprList([p[1]], p[1].coord)
 
             p[1].exprs.append(p[3])
             p[0] = p[1]
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='COMMA'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='expression'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge) 
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-            self.graph.add_edge(edge) 
-            p[0].ref = "node_"+str(counter-1)
-        print "function-98: ", counter
+            comma = self._add_node('COMMA')
+            expr = self._add_parent_node('expression', lhs, comma, p[3].ref)
+        p[0].ref = expr
 
+    @_make_rule('typedef_name', 'TYPEID')
     def p_typedef_name(self, p):
         """ typedef_name : TYPEID """
         p[0] = c_ast.IdentifierType([p[1]], coord=self._coord(p.lineno(1)))
-        # print "fdgdfgsffd",p[1]
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='TYPEID'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='typedef_name'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge) 
-        p[0].ref = "node_"+str(counter-1)
-        print "function-99: ", counter
 
     def p_assignment_expression(self, p):
         """ assignment_expression   : conditional_expression
                                     | unary_expression assignment_operator assignment_expression
         """
-        global counter
         if len(p) == 2:
             p[0] = p[1]
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='assignment_expression'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge) 
-            p[0].ref = "node_"+str(counter-1)
+            p[0].ref = self._add_parent_node('assignment_expression', p[1].ref)
         else:
-            tmp_node = p[2].split("@")
-            p[2] = tmp_node[0]
-            p[0] = c_ast.Assignment(p[2], p[1], p[3], p[1].coord)
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='assignment_expression'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge) 
-            edge = pydot.Edge("node_"+str(counter-1), tmp_node[1])
-            self.graph.add_edge(edge) 
-            edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-            self.graph.add_edge(edge) 
-            p[0].ref = "node_"+str(counter-1)
-        print "function-100: ", counter
+            p[0] = c_ast.Assignment(p[2].value, p[1], p[3], p[1].coord)
+            p[0].ref = self._add_parent_node(
+                'assignment_expression', p[1].ref, p[2].ref, p[3].ref)
 
     # K&R2 defines these as many separate rules, to encode
     # precedence and associativity. Why work hard ? I'll just use
     # the built in precedence/associativity specification feature
     # of PLY. (see precedence declaration above)
     #
+    # Graph labels of the assignment operator tokens
+    _ASSIGN_LABEL = {
+        '=': 'EQUALS',
+        '^=': 'XOREQUAL',
+        '*=': 'TIMESEQUAL',
+        '/=': 'DIVEQUAL',
+        '%=': 'MODEQUAL',
+        '+=': 'PLUSEQUAL',
+        '-=': 'MINUSEQUAL',
+        '<<=': 'LSHIFTEQUAL',
+        '>>=': 'RSHIFTEQUAL',
+        '&=': 'ANDEQUAL',
+        '|=': 'OREQUAL',
+    }
+
     def p_assignment_operator(self, p):
         """ assignment_operator : EQUALS
                                 | XOREQUAL
@@ -3458,143 +2181,54 @@ class CParser(PLYParser):
                                 | ANDEQUAL
                                 | OREQUAL
         """
-        p[0] = p[1]
-        # print "sssssssssss", p[1], type(p[1])
-        global counter
-        if p[1] == '=':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='EQUALS'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='assignment_operator'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            p[0] = p[0] + '@node_'+str(counter-1)
-        elif p[1] == '^=':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='XOREQUAL'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='assignment_operator'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            p[0] = p[0] + '@node_'+str(counter-1)    
-        elif p[1] == '*=':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='TIMESEQUAL'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='assignment_operator'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            p[0] = p[0] + '@node_'+str(counter-1)    
-        elif p[1] == '/=':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='DIVEQUAL'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='assignment_operator'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            p[0] = p[0] + '@node_'+str(counter-1)    
-        elif p[1] == '%=':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='MODEQUAL'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='assignment_operator'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            p[0] = p[0] + '@node_'+str(counter-1)    
-        elif p[1] == '+=':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='PLUSEQUAL'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='assignment_operator'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            p[0] = p[0] + '@node_'+str(counter-1)    
-        elif p[1] == '-=':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='MINUSEQUAL'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='assignment_operator'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            p[0] = p[0] + '@node_'+str(counter-1)    
-        elif p[1] == '<<=':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='LSHIFTEQUAL'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='assignment_operator'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            p[0] = p[0] + '@node_'+str(counter-1)    
-        elif p[1] == '>>=':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='RSHIFTEQUAL'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='assignment_operator'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            p[0] = p[0] + '@node_'+str(counter-1)    
-        elif p[1] == '&=':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='ANDEQUAL'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='assignment_operator'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            p[0] = p[0] + '@node_'+str(counter-1)    
-        else:
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='OREQUAL'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='assignment_operator'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            p[0] = p[0] + '@node_'+str(counter-1)  
-        print "function-101: ", counter   
-    
+        p[0] = _Token(p[1], self._add_token_node(
+            self._ASSIGN_LABEL[p[1]], 'assignment_operator'))
 
+    @_make_rule('constant_expression', 1)
     def p_constant_expression(self, p):
         """ constant_expression : conditional_expression """
         p[0] = p[1]
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='constant_expression'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge) 
-        p[0].ref = "node_"+str(counter-1)
-        print "function-102: ", counter
 
     def p_conditional_expression(self, p):
         """ conditional_expression  : binary_expression
                                     | binary_expression CONDOP expression COLON conditional_expression
         """
-        global counter
         if len(p) == 2:
             p[0] = p[1]
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='conditional_expression'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge) 
-            p[0].ref = "node_"+str(counter-1)
+            p[0].ref = self._add_parent_node(
+                'conditional_expression', p[1].ref)
         else:
             p[0] = c_ast.TernaryOp(p[1], p[3], p[5], p[1].coord)
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='CONDOP'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='COLON'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='conditional_expression'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-            self.graph.add_edge(edge)  
-            edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            edge = pydot.Edge("node_"+str(counter-1), p[5].ref)
-            self.graph.add_edge(edge) 
-            p[0].ref = "node_"+str(counter-1)
-        print "function-103: ", counter
+            condop, colon = self._add_nodes(['CONDOP', 'COLON'])
+            p[0].ref = self._add_parent_node(
+                'conditional_expression', p[1].ref, condop, p[3].ref, colon,
+                p[5].ref)
+
+    # Graph labels of the binary operator tokens, and of the
+    # binary_expression nodes that carry them
+    _BINOP_LABEL = {
+        '*': 'TIMES',
+        '/': 'DIVIDE',
+        '%': 'MOD',
+        '+': 'PLUS',
+        '-': 'MINUS',
+        '>>': 'RSHIFT',
+        '<<': 'LSHIFT',
+        '<': 'LT',
+        '<=': 'LE',
+        '>=': 'GE',
+        '>': 'GT',
+        '==': 'EQ',
+        '!=': 'NE',
+        '&': 'AND',
+        '|': 'OR',
+        '^': 'XOR',
+        '&&': 'LAND',
+        '||': 'LOR',
+    }
+    _BINOP_NODE_LABEL = dict(
+        (op, 'binary_expression: ' + label)
+        for op, label in _BINOP_LABEL.items())
 
     def p_binary_expression(self, p):
         """ binary_expression   : cast_expression
@@ -3617,319 +2251,46 @@ class CParser(PLYParser):
                                 | binary_expression LAND binary_expression
                                 | binary_expression LOR binary_expression
         """
-        global counter 
         if len(p) == 2:
             p[0] = p[1]
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='binary_expression'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge) 
-            p[0].ref = "node_"+str(counter-1)
+            p[0].ref = self._add_parent_node('binary_expression', p[1].ref)
 
         else:
             p[0] = c_ast.BinaryOp(p[2], p[1], p[3], p[1].coord)
-            if p[2] == '*':
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='TIMES'))
-                counter = counter+1
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='binary_expression'))
-                counter = counter+1
-                edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-                self.graph.add_edge(edge)
-                edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-                self.graph.add_edge(edge) 
-                edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-                self.graph.add_edge(edge)
-                p[0].ref = "node_"+str(counter-1)
-            elif p[2] == '/':
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='DIVIDE'))
-                counter = counter+1
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='binary_expression'))
-                counter = counter+1
-                edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-                self.graph.add_edge(edge)
-                edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-                self.graph.add_edge(edge) 
-                edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-                self.graph.add_edge(edge)
-                p[0].ref = "node_"+str(counter-1)
-            elif p[2] == '%':
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='MOD'))
-                counter = counter+1
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='binary_expression'))
-                counter = counter+1
-                edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-                self.graph.add_edge(edge)
-                edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-                self.graph.add_edge(edge) 
-                edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-                self.graph.add_edge(edge)
-                p[0].ref = "node_"+str(counter-1)
-            elif p[2] == '+':
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='PLUS'))
-                counter = counter+1
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='binary_expression'))
-                counter = counter+1
-                edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-                self.graph.add_edge(edge)
-                edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-                self.graph.add_edge(edge) 
-                edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-                self.graph.add_edge(edge)
-                p[0].ref = "node_"+str(counter-1)
-            elif p[2] == '-':
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='MINUS'))
-                counter = counter+1
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='binary_expression'))
-                counter = counter+1
-                edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-                self.graph.add_edge(edge)
-                edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-                self.graph.add_edge(edge) 
-                edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-                self.graph.add_edge(edge)
-                p[0].ref = "node_"+str(counter-1)
-            elif p[2] == '>>':
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='RSHIFT'))
-                counter = counter+1
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='binary_expression'))
-                counter = counter+1
-                edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-                self.graph.add_edge(edge)
-                edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-                self.graph.add_edge(edge) 
-                edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-                self.graph.add_edge(edge)
-                p[0].ref = "node_"+str(counter-1)
-            elif p[2] == '<<':
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='LSHIFT'))
-                counter = counter+1
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='binary_expression'))
-                counter = counter+1
-                edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-                self.graph.add_edge(edge)
-                edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-                self.graph.add_edge(edge) 
-                edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-                self.graph.add_edge(edge)
-                p[0].ref = "node_"+str(counter-1)
-            elif p[2] == '<':
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='LT'))
-                counter = counter+1
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='binary_expression'))
-                counter = counter+1
-                edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-                self.graph.add_edge(edge)
-                edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-                self.graph.add_edge(edge) 
-                edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-                self.graph.add_edge(edge)
-                p[0].ref = "node_"+str(counter-1)
-            elif p[2] == '<=':
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='LE'))
-                counter = counter+1
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='binary_expression'))
-                counter = counter+1
-                edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-                self.graph.add_edge(edge)
-                edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-                self.graph.add_edge(edge) 
-                edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-                self.graph.add_edge(edge)
-                p[0].ref = "node_"+str(counter-1)
-            elif p[2] == '>=':
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='GE'))
-                counter = counter+1
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='binary_expression'))
-                counter = counter+1
-                edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-                self.graph.add_edge(edge)
-                edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-                self.graph.add_edge(edge) 
-                edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-                self.graph.add_edge(edge)
-                p[0].ref = "node_"+str(counter-1)
-            elif p[2] == '>':
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='GT'))
-                counter = counter+1
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='binary_expression'))
-                counter = counter+1
-                edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-                self.graph.add_edge(edge)
-                edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-                self.graph.add_edge(edge) 
-                edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-                self.graph.add_edge(edge)
-                p[0].ref = "node_"+str(counter-1)
-            elif p[2] == '==':
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='EQ'))
-                counter = counter+1
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='binary_expression'))
-                counter = counter+1
-                edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-                self.graph.add_edge(edge)
-                edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-                self.graph.add_edge(edge) 
-                edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-                self.graph.add_edge(edge)
-                p[0].ref = "node_"+str(counter-1)
-            elif p[2] == '!=':
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='NE'))
-                counter = counter+1
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='binary_expression'))
-                counter = counter+1
-                edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-                self.graph.add_edge(edge)
-                edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-                self.graph.add_edge(edge) 
-                edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-                self.graph.add_edge(edge)
-                p[0].ref = "node_"+str(counter-1)
-            elif p[2] == '&':
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='AND'))
-                counter = counter+1
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='binary_expression'))
-                counter = counter+1
-                edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-                self.graph.add_edge(edge)
-                edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-                self.graph.add_edge(edge) 
-                edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-                self.graph.add_edge(edge)
-                p[0].ref = "node_"+str(counter-1)
-            elif p[2] == '|':
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='OR'))
-                counter = counter+1
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='binary_expression'))
-                counter = counter+1
-                edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-                self.graph.add_edge(edge)
-                edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-                self.graph.add_edge(edge) 
-                edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-                self.graph.add_edge(edge)
-                p[0].ref = "node_"+str(counter-1)
-            elif p[2] == '^':
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='XOR'))
-                counter = counter+1
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='binary_expression'))
-                counter = counter+1
-                edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-                self.graph.add_edge(edge)
-                edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-                self.graph.add_edge(edge) 
-                edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-                self.graph.add_edge(edge)
-                p[0].ref = "node_"+str(counter-1)
-            elif p[2] == '&&':
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='LAND'))
-                counter = counter+1
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='binary_expression'))
-                counter = counter+1
-                edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-                self.graph.add_edge(edge)
-                edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-                self.graph.add_edge(edge) 
-                edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-                self.graph.add_edge(edge)
-                p[0].ref = "node_"+str(counter-1)
-            else:
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='LOR'))
-                counter = counter+1
-                self.graph.add_node(pydot.Node('node_'+str(counter), label='binary_expression'))
-                counter = counter+1
-                edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-                self.graph.add_edge(edge)
-                edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-                self.graph.add_edge(edge) 
-                edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-                self.graph.add_edge(edge)
-                p[0].ref = "node_"+str(counter-1)
-            print "function-104: ", counter
+            p[0].ref = self._add_binop_node(
+                self._BINOP_NODE_LABEL[p[2]], p[1].ref, p[3].ref)
 
+    @_make_rule('cast_expression', 1)
     def p_cast_expression_1(self, p):
         """ cast_expression : unary_expression """
         p[0] = p[1]
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='cast_expression'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge) 
-        p[0].ref = "node_"+str(counter-1)
-        print "function-105: ", counter
 
+    @_make_rule('cast_expression', 'LPAREN', 2, 'RPAREN', 4)
     def p_cast_expression_2(self, p):
         """ cast_expression : LPAREN type_name RPAREN cast_expression """
         p[0] = c_ast.Cast(p[2], p[4], self._coord(p.lineno(1)))
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='LPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='RPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='cast_expression'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), p[4].ref)
-        self.graph.add_edge(edge) 
-        p[0].ref = "node_"+str(counter-1)
-        print "function-106: ", counter
 
+    @_make_rule('unary_expression', 1)
     def p_unary_expression_1(self, p):
         """ unary_expression    : postfix_expression """
         p[0] = p[1]
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='unary_expression'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge) 
-        p[0].ref = "node_"+str(counter-1)
-        print "function-107: ", counter
 
     def p_unary_expression_2(self, p):
         """ unary_expression    : PLUSPLUS unary_expression
                                 | MINUSMINUS unary_expression
                                 | unary_operator cast_expression
         """
-        tmp_node = []
-        if p[1] <> "++":
-            if p[1] <> "--":
-                tmp_node = p[1].split("@")
-                p[1] = tmp_node[0]
-        p[0] = c_ast.UnaryOp(p[1], p[2], p[2].coord)
-        global counter
-        if p[1] == '++':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='PLUSPLUS'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='unary_expression'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-            self.graph.add_edge(edge) 
-            p[0].ref = "node_"+str(counter-1)
-        elif p[1] == '--':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='MINUSMINUS'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='unary_expression'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-            self.graph.add_edge(edge) 
-            p[0].ref = "node_"+str(counter-1)
+        if isinstance(p[1], _Token):
+            op, op_ref = p[1]
+            nid = self._add_parent_node('unary_expression', op_ref)
         else:
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='unary_expression'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), tmp_node[1])
-            self.graph.add_edge(edge) 
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-            self.graph.add_edge(edge) 
-            p[0].ref = "node_"+str(counter-1)  
-        print "function-108: ", counter  
+            op = p[1]
+            nid = self._add_token_node(
+                'PLUSPLUS' if op == '++' else 'MINUSMINUS',
+                'unary_expression')
+        self._add_edge(nid, p[2].ref)
+        p[0] = c_ast.UnaryOp(op, p[2], p[2].coord)
+        p[0].ref = nid
 
     def p_unary_expression_3(self, p):
         """ unary_expression    : SIZEOF unary_expression
@@ -3939,36 +2300,27 @@ class CParser(PLYParser):
             p[1],
             p[2] if len(p) == 3 else p[3],
             self._coord(p.lineno(1)))
-        global counter
         if len(p) == 3:
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='SIZEOF'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='unary_expression'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-            self.graph.add_edge(edge) 
-            p[0].ref = "node_"+str(counter-1)
-        else:
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='SIZEOF'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='LPAREN'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='RPAREN'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='unary_expression'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-4))
-            self.graph.add_edge(edge) 
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-            self.graph.add_edge(edge) 
-            edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-            self.graph.add_edge(edge) 
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            p[0].ref = "node_"+str(counter-1)
-        print "function-109: ", counter
+            nid = self._add_token_node('SIZEOF', 'unary_expression')
+            self._add_edge(nid, p[2].ref)
+            p[0].ref = nid
+        else:
+            sizeof, lparen, rparen = self._add_nodes(
+                ['SIZEOF', 'LPAREN', 'RPAREN'])
+            p[0].ref = self._add_parent_node(
+                'unary_expression', sizeof, lparen, p[3].ref, rparen)
+
+    # Graph labels of the unary operator tokens. '!' and '~' keep the
+    # labels the graph has always given them, the reverse of their
+    # token names (LNOT and NOT)
+    _UNARYOP_LABEL = {
+        '&': 'AND',
+        '*': 'TIMES',
+        '+': 'PLUS',
+        '-': 'MINUS',
+        '!': 'NOT',
+        '~': 'LNOT',
+    }
 
     def p_unary_operator(self, p):
         """ unary_operator  : AND
@@ -3978,285 +2330,91 @@ class CParser(PLYParser):
                             | NOT
                             | LNOT
         """
-        p[0] = p[1]
-        global counter
-        if p[1] == '&':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='AND'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='unary_operator'))
-            counter = counter+1    
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            p[0] = p[0] + '@node_'+str(counter-1)
-        elif p[1] == '*':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='TIMES'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='unary_operator'))
-            counter = counter+1    
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            p[0] = p[0] + '@node_'+str(counter-1)
-        elif p[1] == '+':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='PLUS'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='unary_operator'))
-            counter = counter+1    
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            p[0] = p[0] + '@node_'+str(counter-1)
-        elif p[1] == '-':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='MINUS'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='unary_operator'))
-            counter = counter+1    
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            p[0] = p[0] + '@node_'+str(counter-1)
-        elif p[1] == '!':
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='NOT'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='unary_operator'))
-            counter = counter+1    
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            p[0] = p[0] + '@node_'+str(counter-1)
-        else:
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='LNOT'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='unary_operator'))
-            counter = counter+1    
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            p[0] = p[0] + '@node_'+str(counter-1)
-        print "function-110: ", counter
+        nid = self._add_token_node(
+            self._UNARYOP_LABEL[p[1]], 'unary_operator')
+        p[0] = _Token(p[1], nid)
 
+    @_make_rule('postfix_expression', 1)
     def p_postfix_expression_1(self, p):
         """ postfix_expression  : primary_expression """
         p[0] = p[1]
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='postfix_expression'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge) 
-        p[0].ref =  "node_"+str(counter-1)
-        print "function-111: ", counter
 
+    @_make_rule('postfix_expression', 1, 'LBRACKET', 3, 'RBRACKET')
     def p_postfix_expression_2(self, p):
         """ postfix_expression  : postfix_expression LBRACKET expression RBRACKET """
         p[0] = c_ast.ArrayRef(p[1], p[3], p[1].coord)
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='LBRACKET'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='RBRACKET'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='postfix_expression'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge) 
-        p[0].ref =  "node_"+str(counter-1)
-        print "function-112: ", counter
 
+    @_make_rules(
+        'postfix_expression',
+        (1, 'LPAREN', 3, 'RPAREN'),
+        (1, 'LPAREN', 'RPAREN'))
     def p_postfix_expression_3(self, p):
         """ postfix_expression  : postfix_expression LPAREN argument_expression_list RPAREN
                                 | postfix_expression LPAREN RPAREN
         """
         p[0] = c_ast.FuncCall(p[1], p[3] if len(p) == 5 else None, p[1].coord)
-        global counter 
-        if len(p) == 4:
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='LPAREN'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='RPAREN'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='postfix_expression'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge) 
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-            self.graph.add_edge(edge) 
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            p[0].ref =  "node_"+str(counter-1)
-        else:
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='LPAREN'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='RPAREN'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='postfix_expression'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge) 
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-            self.graph.add_edge(edge) 
-            edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-            self.graph.add_edge(edge) 
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge) 
-            p[0].ref =  "node_"+str(counter-1)
-        print "function-113: ", counter
 
+    @_make_rule('postfix_expression', 1, 'PERIOD/ARROW', 'ID/TYPEID')
     def p_postfix_expression_4(self, p):
         """ postfix_expression  : postfix_expression PERIOD ID
                                 | postfix_expression PERIOD TYPEID
                                 | postfix_expression ARROW ID
                                 | postfix_expression ARROW TYPEID
         """
-        # print "tttttttttttttttttttttttttttt" , p[3], type(p[3])
         field = c_ast.ID(p[3], self._coord(p.lineno(3)))
         p[0] = c_ast.StructRef(p[1], p[2], field, p[1].coord)
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='PERIOD/ARROW'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='ID/TYPEID'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='postfix_expression'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge) 
-        p[0].ref =  "node_"+str(counter-1)
-        print "function-114: ", counter
 
+    @_make_rule('postfix_expression', 1, 'INCREMENT / DECREMENT')
     def p_postfix_expression_5(self, p):
         """ postfix_expression  : postfix_expression PLUSPLUS
                                 | postfix_expression MINUSMINUS
         """
         p[0] = c_ast.UnaryOp('p' + p[2], p[1], p[1].coord)
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='INCREMENT / DECREMENT'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='postfix_expression'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge) 
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge) 
-        p[0].ref =  "node_"+str(counter-1)
-        print "function-115: ", counter
-         
 
+    @_make_rules(
+        'postfix_expression',
+        ('LPAREN', 2, 'RPAREN', 4, 5, 6),
+        ('LPAREN', 2, 'RPAREN', 4, 5, 'COMMA', 7))
     def p_postfix_expression_6(self, p):
         """ postfix_expression  : LPAREN type_name RPAREN brace_open initializer_list brace_close
                                 | LPAREN type_name RPAREN brace_open initializer_list COMMA brace_close
         """
         p[0] = c_ast.CompoundLiteral(p[2], p[5])
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='LPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='RPAREN'))
-        counter = counter+1
-        if len(p) ==  7:
-            tmp_node1 = p[4].split("@")
-            p[4] = tmp_node1[0]
-            tmp_node2 = p[6].split("@")
-            p[6] = tmp_node2[0]
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='postfix_expression'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-            self.graph.add_edge(edge)  
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-            self.graph.add_edge(edge)      
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)  
-            edge = pydot.Edge("node_"+str(counter-1), tmp_node1[1])
-            self.graph.add_edge(edge)      
-            edge = pydot.Edge("node_"+str(counter-1), p[5].ref)
-            self.graph.add_edge(edge)      
-            edge = pydot.Edge("node_"+str(counter-1), tmp_node2[1])
-            self.graph.add_edge(edge)      
-        else:
-            tmp_node1 = p[4].split("@")
-            p[4] = tmp_node1[0]
-            tmp_node2 = p[7].split("@")
-            p[7] = tmp_node2[0]
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='COMMA'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='postfix_expression'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-4))
-            self.graph.add_edge(edge)  
-            edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-            self.graph.add_edge(edge)      
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-            self.graph.add_edge(edge)  
-            edge = pydot.Edge("node_"+str(counter-1), tmp_node1[1])
-            self.graph.add_edge(edge)      
-            edge = pydot.Edge("node_"+str(counter-1), p[5].ref)
-            self.graph.add_edge(edge)      
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)  
-            edge = pydot.Edge("node_"+str(counter-1), tmp_node2[1])
-            self.graph.add_edge(edge)  
-        p[0].ref =  "node_"+str(counter-1)
-        print "function-116: ", counter
-        
 
+    @_make_rule('primary_expression', 1)
     def p_primary_expression_1(self, p):
         """ primary_expression  : identifier """
         p[0] = p[1]
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='primary_expression'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge)      
-        p[0].ref =  "node_"+str(counter-1)
-        print "function-117: ", counter
-        
 
+    @_make_rule('primary_expression', 1)
     def p_primary_expression_2(self, p):
         """ primary_expression  : constant """
         p[0] = p[1]
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='primary_expression'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge)      
-        p[0].ref =  "node_"+str(counter-1)
-        print "function-118: ", counter
-        
+
+    @_make_rule('primary_expression', 1)
     def p_primary_expression_3(self, p):
         """ primary_expression  : unified_string_literal
                                 | unified_wstring_literal
         """
+        # Join the pieces of the unified string literal (see below)
+        pieces = p[1].value
+        if len(pieces) == 1:
+            p[1].value = pieces[0]
+        elif pieces[0][0] == 'L':
+            p[1].value = 'L"%s"' % ''.join(
+                [piece.rstrip()[2:-1] for piece in pieces])
+        else:
+            p[1].value = '"%s"' % ''.join(
+                [piece[1:-1] for piece in pieces])
         p[0] = p[1]
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='primary_expression'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-        self.graph.add_edge(edge)      
-        p[0].ref =  "node_"+str(counter-1)
-        print "function-119: ", counter
-        
 
+    @_make_rule('primary_expression', 'LPAREN', 2, 'RPAREN')
     def p_primary_expression_4(self, p):
         """ primary_expression  : LPAREN expression RPAREN """
         p[0] = p[2]
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='LPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='RPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='primary_expression'))
-        counter = counter+1
-        
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge)  
-        edge = pydot.Edge("node_"+str(counter-1), p[2].ref)
-        self.graph.add_edge(edge)      
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)  
-        p[0].ref =  "node_"+str(counter-1)
-        print "function-120: ", counter
-        
 
+    @_make_rule(
+        'primary_expression', 'OFFSETOF', 'LPAREN', 3, 'COMMA', 5, 'RPAREN')
     def p_primary_expression_5(self, p):
         """ primary_expression  : OFFSETOF LPAREN type_name COMMA offsetof_member_designator RPAREN
         """
@@ -4264,134 +2422,50 @@ class CParser(PLYParser):
         p[0] = c_ast.FuncCall(c_ast.ID(p[1], coord),
                               c_ast.ExprList([p[3], p[5]], coord),
                               coord)
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='OFFSETOF'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='LPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='COMMA'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='RPAREN'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='primary_expression'))
-        counter = counter+1
-                
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-5))
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-4))
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-        self.graph.add_edge(edge)      
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-        self.graph.add_edge(edge)  
-        edge = pydot.Edge("node_"+str(counter-1), p[5].ref)
-        self.graph.add_edge(edge)
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-
-        p[0].ref =  "node_"+str(counter-1)
-        print "function-121: ", counter
-
-
 
+    @_make_rules(
+        'offsetof_member_designator',
+        (1,),
+        (1, 'PERIOD', 3),
+        (1, 'LBRACKET', 3, 'RBRACKET'))
     def p_offsetof_member_designator(self, p):
         """ offsetof_member_designator : identifier
                                          | offsetof_member_designator PERIOD identifier
                                          | offsetof_member_designator LBRACKET expression RBRACKET
         """
-        global counter
         if len(p) == 2:
             p[0] = p[1]
-            # global counter
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='offsetof_member_designator'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge)
-            p[0].ref =  "node_"+str(counter-1)
-
         elif len(p) == 4:
             field = c_ast.ID(p[3], self._coord(p.lineno(3)))
             p[0] = c_ast.StructRef(p[1], p[2], field, p[1].coord)
-            # global counter
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='PERIOD'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='offsetof_member_designator'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-            self.graph.add_edge(edge)
-            p[0].ref =  "node_"+str(counter-1)
-
         elif len(p) == 5:
             p[0] = c_ast.ArrayRef(p[1], p[3], p[1].coord)
-            # global counter
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='LBRACKET'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='RBRACKET'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='offsetof_member_designator'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-3))
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            p[0].ref =  "node_"+str(counter-1)
-
         else:
             raise NotImplementedError("Unexpected parsing state. len(p): %u" % len(p))
-        print "function-122: ", counter
 
     def p_argument_expression_list(self, p):
         """ argument_expression_list    : assignment_expression
                                         | argument_expression_list COMMA assignment_expression
         """
-        global counter
         if len(p) == 2: # single expr
             p[0] = c_ast.ExprList([p[1]], p[1].coord)
-            # global counter
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='argument_expression_list'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge)
-            p[0].ref =  "node_"+str(counter-1)
+            p[0].ref = self._add_parent_node(
+                'argument_expression_list', p[1].ref)
         else:
+            # One graph node holds the whole list, like the ExprList it
+            # stands for: each further argument hangs off it, after a
+            # COMMA leaf
             p[1].exprs.append(p[3])
             p[0] = p[1]
-            # global counter
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='COMMA'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='argument_expression_list'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), p[3].ref)
-            self.graph.add_edge(edge)
-            p[0].ref =  "node_"+str(counter-1)
-        print "function-123: ", counter
+            comma = self._add_node('COMMA')
+            self._add_edges(((p[0].ref, comma), (p[0].ref, p[3].ref)))
 
+    @_make_rule('identifier', 'ID')
     def p_identifier(self, p):
         """ identifier  : ID """
         p[0] = c_ast.ID(p[1], self._coord(p.lineno(1)))
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='ID'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='identifier'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0].ref =  "node_"+str(counter-1)
-        # print "ABHISHEK: ",p[1]
-        print "function-124: ", counter
 
+    @_make_rule('constant', 'INT_CONST')
     def p_constant_1(self, p):
         """ constant    : INT_CONST_DEC
                         | INT_CONST_OCT
@@ -4400,144 +2474,74 @@ class CParser(PLYParser):
         """
         p[0] = c_ast.Constant(
             'int', p[1], self._coord(p.lineno(1)))
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='INT_CONST'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='constant'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0].ref =  "node_"+str(counter-1)
-        print "function-125: ", counter
 
+    @_make_rule('constant', 'FLOAT/HEX_FLOAT_CONST')
     def p_constant_2(self, p):
         """ constant    : FLOAT_CONST
                         | HEX_FLOAT_CONST
         """
         p[0] = c_ast.Constant(
             'float', p[1], self._coord(p.lineno(1)))
-        global counter
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='FLOAT/HEX_FLOAT_CONST'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='constant'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0].ref =  "node_"+str(counter-1)
-        print "function-126: ", counter
 
+    @_make_rule('constant', 'CHAR_CONST')
     def p_constant_3(self, p):
         """ constant    : CHAR_CONST
                         | WCHAR_CONST
         """
-        global counter
         p[0] = c_ast.Constant(
             'char', p[1], self._coord(p.lineno(1)))
-        # print "char constant", type(p[1])
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='CHAR_CONST'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='constant'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        p[0].ref =  "node_"+str(counter-1)
-        print "function-127: ", counter
     # The "unified" string and wstring literal rules are for supporting
     # concatenation of adjacent string literals.
     # I.e. "hello " "world" is seen by the C compiler as a single string literal
     # with the value "hello world"
     #
+    # While the run lasts, the Constant's value is the list of its
+    # pieces; primary_expression joins them once the run is over, so
+    # that a long run is not copied again for each piece.
+    #
     def p_unified_string_literal(self, p):
         """ unified_string_literal  : STRING_LITERAL
                                     | unified_string_literal STRING_LITERAL
         """
-        global counter
         if len(p) == 2: # single literal
             p[0] = c_ast.Constant(
-                'string', p[1], self._coord(p.lineno(1)))
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='STRING_LITERAL'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='unified_string_literal'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            p[0].ref =  "node_"+str(counter-1)
+                'string', [p[1]], self._coord(p.lineno(1)))
+            nid = self._add_token_node('STRING_LITERAL', 'unified_string_literal')
+            p[0].ref =  nid
         else:
-            p[1].value = p[1].value[:-1] + p[2][1:]
+            p[1].value.append(p[2])
             p[0] = p[1]
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='STRING_LITERAL'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='unified_string_literal'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge)
-            p[0].ref = "node_"+str(counter-1)
-        print "function-128: ", counter
-            
+            nid = self._add_token_node('STRING_LITERAL', 'unified_string_literal')
+            self._add_edge(nid, p[1].ref)
+            p[0].ref = nid
 
     def p_unified_wstring_literal(self, p):
         """ unified_wstring_literal : WSTRING_LITERAL
                                     | unified_wstring_literal WSTRING_LITERAL
         """
-        global counter
         if len(p) == 2: # single literal
             p[0] = c_ast.Constant(
-                'string', p[1], self._coord(p.lineno(1)))
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='WSTRING_LITERAL'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='unified_wstring_literal'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            p[0].ref =  "node_"+str(counter-1)
+                'string', [p[1]], self._coord(p.lineno(1)))
+            nid = self._add_token_node('WSTRING_LITERAL', 'unified_wstring_literal')
+            p[0].ref =  nid
         else:
-            p[1].value = p[1].value.rstrip()[:-1] + p[2][2:]
+            p[1].value.append(p[2])
             p[0] = p[1]
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='WSTRING_LITERAL'))
-            counter = counter+1
-            self.graph.add_node(pydot.Node('node_'+str(counter), label='unified_wstring_literal'))
-            counter = counter+1
-            edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-            self.graph.add_edge(edge)
-            edge = pydot.Edge("node_"+str(counter-1), p[1].ref)
-            self.graph.add_edge(edge)
-            p[0].ref = "node_"+str(counter-1)
-        print "function-129: ", counter
-            
+            nid = self._add_token_node('WSTRING_LITERAL', 'unified_wstring_literal')
+            self._add_edge(nid, p[1].ref)
+            p[0].ref = nid
 
     def p_brace_open(self, p):
         """ brace_open  :   LBRACE
         """
-        global counter
-        p[0] = p[1]
         p.set_lineno(0, p.lineno(1))
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='LBRACE'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='brace_open'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        #print "right brace printing", p[1], type(p[1])
-        p[0] = p[0] + "@node_" + str(counter-1)  
-        print "function-130: ", counter  
+        p[0] = _Token(p[1], self._add_token_node('LBRACE', 'brace_open'))
 
     def p_brace_close(self, p):
         """ brace_close :   RBRACE
         """
-        global counter
-        p[0] = p[1]
         p.set_lineno(0, p.lineno(1))
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='RBRACE'))
-        counter = counter+1
-        self.graph.add_node(pydot.Node('node_'+str(counter), label='brace_close'))
-        counter = counter+1
-        edge = pydot.Edge("node_"+str(counter-1), "node_"+str(counter-2))
-        self.graph.add_edge(edge)
-        #print "right brace printing", p[1], type(p[1])
-        p[0] = p[0] + "@node_" + str(counter-1)
-        print "function-131: ", counter
+        p[0] = _Token(p[1], self._add_token_node('RBRACE', 'brace_close'))
 
     def p_empty(self, p):
         'empty : '
@@ -4554,38 +2558,4 @@ class CParser(PLYParser):
                             column=self.clex.find_tok_column(p)))
         else:
             self._parse_error('At end of input', self.clex.filename)
-        print "function-132: ", counter
-
-
-#------------------------------------------------------------------------------
-if __name__ == "__main__":
-    import pprint
-    import time, sys
-    from __init__ import preprocess_file
-    from __init__ import parse_file
-    # from pycparser import preprocess_file
-    graph = pydot.Dot(graph_type='digraph')
-    t1 = time.time()
-    parser = CParser(lex_optimize=False, yacc_debug=True, yacc_optimize=False, graph=graph)
-    sys.stdout.write(str(time.time() - t1) + '\n')
-    filename = 'test2.c'
-    # text1 = preprocess_file(filename, cpp_path='cpp', cpp_args=r'-Iutils/fake_libc_include')
-    with open(filename, 'rU') as f:
-        text = f.read()
-
-    buf = '''
-        int (*k)(int);
-    '''
-
-    # set debuglevel to 2 for debugging
-    t, graph_returned = parser.parse(text, filename, debuglevel=0)
-    print "graph returned: ", graph_returned
-    graph_returned.write_png('test2.png')
-    # t.show()
-
-    # ast = parse_file(filename, use_cpp=True,
-    #         cpp_path='cpp',
-    #         cpp_args=r'-Iutils/fake_libc_include')
-    # ast.show(showcoord=True)
-    # self.graph.write_png('test1.png')
 
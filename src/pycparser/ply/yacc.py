@@ -3273,8 +3273,10 @@ def yacc(method='LALR', debug=yaccdebug, module=None, tabmodule=tab_module, star
     if pinfo.error:
         raise YaccError('Unable to build parser')
 
-    # Check signature against table files (if any)
-    signature = pinfo.signature()
+    # Check signature against table files (if any). In optimized mode the
+    # tables are trusted as they are, so the signature over the rule
+    # docstrings is only computed if the tables have to be regenerated.
+    signature = None if optimize else pinfo.signature()
 
     # Read the tables
     try:
@@ -3296,6 +3298,9 @@ def yacc(method='LALR', debug=yaccdebug, module=None, tabmodule=tab_module, star
     except ImportError:
         pass
 
+    if signature is None:
+        signature = pinfo.signature()
+
     if debuglog is None:
         if debug:
             try:
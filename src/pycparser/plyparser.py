@@ -7,8 +7,6 @@
 # Eli Bendersky [http://eli.thegreenplace.net]
 # License: BSD
 #-----------------------------------------------------------------
-tmp = -1;
-
 class Coord(object):
     """ Coordinates of a syntactic element. Consists of:
             - File name
@@ -29,59 +27,61 @@ class Coord(object):
 
 class ParseError(Exception): pass
 
-import pydot 
+
 class PLYParser(object):
-    def _create_opt_rule(self, rulename, counter):
+    # Names of the rules whose <rulename>_opt applications get a graph
+    # node of their own. The others pass the value of the rule, or None,
+    # through unchanged, without adding to the graph. A missing optional
+    # value stays None, which has nowhere to carry a ref, so it is always
+    # drawn as the parser's shared "empty" node.
+    graph_opt_rules = frozenset()
+
+    def _create_opt_rule(self, rulename):
         """ Given a rule name, creates an optional ply.yacc rule
             for it. The name of the optional rule is
             <rulename>_opt
         """
         optname = rulename + '_opt'
-        global tmp
-        print "counter is: ", counter
         def optrule(self, p):
-            global tmp
             p[0] = p[1]
-            self.graph.add_node(pydot.Node('node_'+str(counter), label=optname))
+            if (not self._build_graph or p[1] is None
+                    or rulename not in self.graph_opt_rules):
+                return
+            nid = self._add_node(optname)
             if isinstance(p[1], list):
-                length = len(p[1])
-                print "listtttttt" , p[1], type(p[1][length-1]), length
-                edge = pydot.Edge("node_"+str(counter), p[1][length-1]) #p[1][length-1]
-                p[0].append("node_" + str(counter))
-                print "LISTTTTTTTTTT", p[0], type(p[0]), edge
-                self.graph.add_edge(edge)
-
+                self._add_edge(nid, p[1][-1])
+                p[0][-1] = nid
             elif isinstance(p[1], dict):
-                print "is it a dictinary?", p[1]
-                edge = pydot.Edge("node_"+str(counter), p[1]["ref"])
-                p[0]["ref"] = "node_" + str(counter)
-                self.graph.add_edge(edge)
-
-            elif p[1] is not None:
-                edge = pydot.Edge("node_"+str(counter), p[1].ref)
-                p[0].ref = "node_" + str(counter)
-                print "OBJECTTTTTTT"
-                self.graph.add_edge(edge)
-
+                self._add_edge(nid, p[1]["ref"])
+                p[0]["ref"] = nid
             else:
-                self.graph.add_node(pydot.Node('node_'+str(tmp), label="Empty"))
-                tmp = tmp-1;
-                edge = pydot.Edge("node_"+str(counter), 'node_'+str(tmp+1))
-                self.graph.add_edge(edge)
+                self._add_edge(nid, p[1].ref)
+                p[0].ref = nid
 
-           # self.graph.add_edge(edge)
-            print "LEFTTTTTTT"
-        counter = counter + 1
         optrule.__doc__ = '%s : empty\n| %s' % (optname, rulename)
         optrule.__name__ = 'p_%s' % optname
         setattr(self.__class__, optrule.__name__, optrule)
-        return counter
 
     def _coord(self, lineno, column=None):
-        return Coord(
+        """ Returns the Coord of the given position in the current
+            file. Coords are never modified once made, so all the
+            elements at one position share a single Coord, kept in
+            self._coord_cache. The cache is created on first use;
+            subclasses may reset it to {} to drop the Coords of
+            earlier parses.
+        """
+        try:
+            cache = self._coord_cache
+        except AttributeError:
+            cache = self._coord_cache = {}
+        key = (self.clex.filename, lineno, column)
+        coord = cache.get(key)
+        if coord is None:
+            coord = cache[key] = Coord(
                 file=self.clex.filename,
                 line=lineno,
                 column=column)
+        return coord
 
     def _parse_error(self, msg, coord):
         raise ParseError("%s: %s" % (coord, msg))
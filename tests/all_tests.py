@@ -10,6 +10,7 @@ suite = unittest.TestLoader().loadTestsFromNames(
     [
         'test_c_lexer',
         'test_c_ast',
+        'test_ast_to_dot',
         'test_general',
         'test_c_parser',
         'test_c_generator',
@@ -0,0 +1,47 @@
+import re
+import sys
+import unittest
+
+sys.path.insert(0, '..')
+import pycparser.c_ast as c_ast
+from pycparser.ast_to_dot import DotEmitter, ast_to_dot
+
+
+class TestDotEmitter(unittest.TestCase):
+    def _labels_and_edges(self, text):
+        labels = dict(re.findall(r'(node_\d+) \[label="(\w+)"\];', text))
+        edges = [(labels[a], labels[b]) for a, b in
+                 re.findall(r'(node_\d+) -> (node_\d+);', text)]
+        return sorted(labels.values()), sorted(edges)
+
+    def test_binary_op(self):
+        b1 = c_ast.BinaryOp(
+            op='+',
+            left=c_ast.Constant(type='int', value='6'),
+            right=c_ast.ID(name='joe'))
+        text = ast_to_dot(b1)
+
+        self.assertTrue(text.startswith('digraph G {\n'))
+        self.assertTrue(text.endswith('}\n'))
+        labels, edges = self._labels_and_edges(text)
+        self.assertEqual(labels, ['BinaryOp', 'Constant', 'ID'])
+        self.assertEqual(edges,
+            [('BinaryOp', 'Constant'), ('BinaryOp', 'ID')])
+
+    def test_skips_graph_refs_in_lists(self):
+        # Lists produced by the parser end with the id of their graph
+        # node; the emitter only follows AST nodes
+        comp = c_ast.Compound(block_items=[
+            c_ast.Return(expr=c_ast.ID(name='x')), 17])
+        labels, edges = self._labels_and_edges(ast_to_dot(comp))
+        self.assertEqual(labels, ['Compound', 'ID', 'Return'])
+        self.assertEqual(edges, [('Compound', 'Return'), ('Return', 'ID')])
+
+    def test_visit_returns_node_number(self):
+        emitter = DotEmitter()
+        self.assertEqual(emitter.visit(c_ast.ID(name='a')), 0)
+        self.assertEqual(emitter.visit(c_ast.ID(name='b')), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,6 +10,7 @@ sys.path[0:0] = ['.', '..']
 from pycparser import c_parser
 from pycparser.c_ast import *
 from pycparser.c_parser import CParser, Coord, ParseError
+from pycparser.plyparser import PLYParser
 
 _c_parser = c_parser.CParser(
                 lex_optimize=False,
@@ -81,7 +82,7 @@ def expand_init(init):
 
 class TestCParser_base(unittest.TestCase):
     def parse(self, txt, filename=''):
-        return self.cparser.parse(txt, filename)
+        return self.cparser.parse(txt, filename)[0]
 
     def setUp(self):
         self.cparser = _c_parser
@@ -226,6 +227,29 @@ class TestCParser_fundamentals(TestCParser_base):
         self.assert_coord(forloop.cond, 2, 'f.c')
         self.assert_coord(forloop.next, 3, 'f.c')
 
+    def test_coords_are_shared_per_line(self):
+        parser = CParser()
+        ast, graph = parser.parse('int a, b;\nint c;', 'x.c')
+        a, b, c = [d for d in ast.ext if isinstance(d, Decl)]
+        self.assertIs(a.coord, b.coord)
+        self.assertEqual(str(c.coord), 'x.c:2')
+
+        # A new parse starts from a fresh cache
+        ast2, graph = parser.parse('int a;', 'y.c')
+        self.assertEqual(str(ast2.ext[0].coord), 'y.c:1')
+
+    def test_coords_in_other_plyparser_subclasses(self):
+        class Lexer(object):
+            filename = 'z.c'
+
+        class Parser(PLYParser):
+            clex = Lexer()
+
+        parser = Parser()
+        coord = parser._coord(3, 4)
+        self.assertEqual(str(coord), 'z.c:3:4')
+        self.assertIs(parser._coord(3, 4), coord)
+
     def test_simple_decls(self):
         self.assertEqual(self.get_decl('int a;'),
             ['Decl', 'a', ['TypeDecl', ['IdentifierType', ['int']]]])
@@ -1196,6 +1220,20 @@ class TestCParser_fundamentals(TestCParser_base):
                 ['Constant', 'int', '4'],
                 ([['ID', 'b']], ['Constant', 'int', '5'])])
 
+    def test_decl_named_inits_chained(self):
+        code = 'struct s x = {.b[0] = t, .c.d[1][2] = 3};'
+        expected = [
+            ([['ID', 'b'], ['Constant', 'int', '0']], ['ID', 't']),
+            ([['ID', 'c'], ['ID', 'd'],
+              ['Constant', 'int', '1'], ['Constant', 'int', '2']],
+                ['Constant', 'int', '3'])]
+
+        # The designator list must come out the same whether or not
+        # the parse graph is built alongside the AST
+        for build_graph in (False, True):
+            ast, graph = CParser(build_graph=build_graph).parse(code)
+            self.assertEqual(expand_init(ast.ext[0].init), expected)
+
     def test_function_definitions(self):
         def parse_fdef(str):
             return self.parse(str).ext[0]
@@ -1898,6 +1936,39 @@ class TestCParser_typenames(TestCParser_base):
         self.assertRaises(ParseError, self.parse, s2)
 
 
+class TestCParser_graph(TestCParser_base):
+    def test_graph_with_stray_semicolons(self):
+        for code in (';', 'int a;;'):
+            ast, graph = CParser(build_graph=True).parse(code)
+            self.assertTrue(isinstance(ast, FileAST))
+            self.assertIn('[label="SEMI"]', graph)
+
+    def test_graph_with_qualifier_lists(self):
+        class OptParser(CParser):
+            graph_opt_rules = frozenset(['type_qualifier_list'])
+
+        code = 'int * const volatile p; void f(int a[static const 2]);'
+        for parser_class in (CParser, OptParser):
+            for build_graph in (False, True):
+                parser = parser_class(build_graph=build_graph)
+                ast, graph = parser.parse(code)
+                p, f = [d for d in ast.ext if isinstance(d, Decl)]
+                self.assertEqual(p.type.quals, ['const', 'volatile'])
+                arr = f.type.args.params[0].type
+                self.assertEqual(arr.dim_quals, ['static', 'const'])
+
+    def test_opt_rule_nodes_are_opt_in(self):
+        code = 'int f(void) { return 0; }'
+        ast, graph = CParser(build_graph=True).parse(code)
+        self.assertNotIn('_opt"', graph)
+
+        class OptParser(CParser):
+            graph_opt_rules = frozenset(['block_item_list'])
+        ast, graph = OptParser(build_graph=True).parse(code)
+        self.assertIn('[label="block_item_list_opt"]', graph)
+        self.assertNotIn('[label="declaration_list_opt"]', graph)
+
+
 if __name__ == '__main__':
     #~ suite = unittest.TestLoader().loadTestsFromNames(
         #~ ['test_c_parser.TestCParser_fundamentals.test_typedef'])
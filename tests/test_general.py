@@ -23,6 +23,16 @@ class TestParsing(unittest.TestCase):
         ast = parse_file(self._find_file('example_c_file.c'))
         self.assertTrue(isinstance(ast, c_ast.FileAST))
 
+    def test_graph_is_opt_in(self):
+        name = self._find_file('example_c_file.c')
+        ast, graph = parse_file(name)
+        self.assertTrue(isinstance(ast, c_ast.FileAST))
+        self.assertIsNone(graph)
+
+        ast, graph = parse_file(name, build_graph=True)
+        self.assertTrue(isinstance(ast, c_ast.FileAST))
+        self.assertTrue(graph.startswith('digraph G {\n'))
+
     def test_with_cpp(self):
         memmgr_path = self._find_file('memmgr.c')
         c_files_path = os.path.dirname(memmgr_path)